@@ -1,18 +1,29 @@
+import importlib
 import streamlit as st
-from src.pages import scorer, advisor
 
+# Pages are imported on first visit, so one page's heavy dependencies
+# (pandas/matplotlib for the Scorer) don't slow down opening the other
 PAGES = {
-    "Scorer": scorer.show,
-    "Advisor": advisor.show,
+    "Scorer": "src.pages.scorer",
+    "Advisor": "src.pages.advisor",
+    "Tables": "src.pages.tables",
+    "Perf": "src.pages.perf",
 }
+HIDDEN_PAGES = {"Perf"}  # listed only when the URL has ?perf=1
+
+
+def load_page(name):
+    return importlib.import_module(PAGES[name]).show
 
 
 def main():
     st.set_page_config(page_title="Tofu's Flip Seven", layout="wide")
     st.sidebar.title("Navigation")
-    page = st.sidebar.radio("Go to", list(PAGES.keys()))
-    PAGES[page]()
+    show_hidden = st.query_params.get("perf") == "1"
+    pages = [name for name in PAGES if show_hidden or name not in HIDDEN_PAGES]
+    page = st.sidebar.radio("Go to", pages)
+    load_page(page)()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,61 @@
+# ---------------------
+# Imports
+# ---------------------
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core import advisor_logic  # noqa: E402
+
+
+# ---------------------
+# Benchmark
+# ---------------------
+def random_states(n, seed=0):
+    rng = random.Random(seed)
+    master = advisor_logic.build_master_deck()
+    drawn_list, seen_list = [], []
+    for _ in range(n):
+        deck = master.copy()
+        rng.shuffle(deck)
+        k = rng.randint(1, 8)
+        drawn_list.append(deck[:k])
+        seen_list.append(deck[k : k + rng.randint(0, 40)])
+    return drawn_list, seen_list
+
+
+def main(n=50000, parity_n=5000):
+    drawn_list, seen_list = random_states(n)
+    drawn = advisor_logic.cards_to_counts(drawn_list)
+    seen = advisor_logic.cards_to_counts(seen_list)
+
+    start = time.perf_counter()
+    batch = advisor_logic.check_bust_batch(drawn, seen)
+    batch_time = (time.perf_counter() - start) / n
+
+    # Parity against the scalar path
+    start = time.perf_counter()
+    for i in range(parity_n):
+        deck = advisor_logic.build_master_deck_state()
+        advisor_logic.pop_from_deck(drawn_list[i], deck)
+        advisor_logic.pop_from_deck(seen_list[i], deck)
+        advice = advisor_logic.check_bust(drawn_list[i], deck)
+        assert advice["recommendation"] == batch["recommendation"][i], i
+        assert advice["current_score"] == batch["current_score"][i], i
+        assert np.isclose(advice["expected_value"], batch["expected_value"][i], rtol=0, atol=1e-9), i
+        assert np.isclose(advice["bust_chance"], batch["bust_chance"][i], rtol=0, atol=1e-12), i
+        assert np.isclose(advice["event_chance"], batch["event_chance"][i], rtol=0, atol=1e-12), i
+    scalar_time = (time.perf_counter() - start) / parity_n
+
+    print(f"parity: {parity_n} states match")
+    print(f"check_bust (scalar):   {scalar_time * 1e6:8.2f} us/state")
+    print(f"check_bust_batch:      {batch_time * 1e6:8.2f} us/state  ({scalar_time / batch_time:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
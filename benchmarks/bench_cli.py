@@ -0,0 +1,51 @@
+# ---------------------
+# Imports
+# ---------------------
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import cli  # noqa: E402
+from src.core import advisor_logic  # noqa: E402
+
+TARGET_RATE = 100_000  # states/s on one core
+
+
+# ---------------------
+# Benchmark
+# ---------------------
+def random_lines(n, seed=0):
+    # 3 advice states (typed like the Advisor inputs) for every Scorer string
+    rng = random.Random(seed)
+    master = advisor_logic.build_master_deck()
+    lines = []
+    for i in range(n):
+        deck = master.copy()
+        rng.shuffle(deck)
+        k = rng.randint(1, 7)
+        if i % 4 == 0:
+            lines.append(json.dumps({"id": i, "score": ", ".join(deck[:k])}) + "\n")
+        else:
+            seen = deck[k : k + rng.randint(0, 30)]
+            lines.append(json.dumps({"id": i, "drawn": ", ".join(deck[:k]), "seen": ", ".join(seen)}) + "\n")
+    return lines
+
+
+def main(n=200_000):
+    lines = random_lines(n)
+    assert "streamlit" not in sys.modules
+
+    start = time.perf_counter()
+    count = cli.run(iter(lines), io.StringIO())
+    rate = count / (time.perf_counter() - start)
+
+    print(f"cli.run (1 process): {rate:10,.0f} states/s  (target {TARGET_RATE:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# ---------------------
+# Imports
+# ---------------------
+import argparse
+import itertools
+import json
+import random
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core import advisor_logic, policy_table, scoring, tables, targeting, tokenizer, win_probability  # noqa: E402
+from src.core.cache import build_history_table  # noqa: E402
+from src.core.rules import DEFAULT_RULES  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "hot_paths.json"
+TOLERANCE = 0.5  # allowed fractional regression per case
+SLACK_US = 1.0  # absorbs timer noise on sub-microsecond cases
+# Hard limits (us) that hold whatever the baseline says
+BUDGETS_US = {
+    "final_pmf/cold_1_card": 200_000.0,
+    "final_pmf/cold_3_cards_seen_40": 200_000.0,
+}
+
+
+# ---------------------
+# Inputs
+# ---------------------
+def _session(n_players, n_rounds, seed=0):
+    rng = random.Random(seed)
+    ss = {"players": [f"P{i}" for i in range(n_players)]}
+    scoring.initialize_session_state(ss)
+    for _ in range(n_rounds):
+        scoring.commit_round([rng.randint(0, 60) for _ in range(n_players)], ss)
+    return ss
+
+
+def _cold(fn):
+    # Empties the solver's caches first, so every call solves from scratch
+    def run():
+        advisor_logic._solver_cache.clear()
+        advisor_logic._space_cache.clear()
+        return fn()
+    return run
+
+
+def build_cases():
+    """name -> zero-arg callable; realistic and worst-case inputs for each hot path."""
+    master = advisor_logic.build_master_deck()
+    rng = random.Random(0)
+    shuffled = master.copy()
+    rng.shuffle(shuffled)
+    seen_40 = shuffled[:40]
+
+    hand_3 = ["5", "8", "12"]
+    hand_7 = ["1", "3", "5", "7", "9", "11", "+4"]  # 6 numbers + modifier: worst non-terminal hand
+    hand_bust = ["5", "8", "5"]
+    hand_1 = ["x2"]  # slowest one-card hand: 18 free cards and all three Second Chance phases
+
+    full_list = master
+    full_state = advisor_logic.build_master_deck_state()
+    deck_7_list = advisor_logic.pop_from_deck(hand_7, master.copy())
+    deck_7_state = advisor_logic.pop_from_deck(hand_7, advisor_logic.build_master_deck_state())
+    deck_1_state = advisor_logic.pop_from_deck(hand_1, advisor_logic.build_master_deck_state())
+    unseen_3 = [card for card in shuffled if card not in hand_3][:40]
+    deck_3_seen_40 = advisor_logic.pop_from_deck(hand_3 + unseen_3, advisor_logic.build_master_deck_state())
+
+    small = _session(4, 10)
+    large = _session(20, 300)
+    large_history = scoring.get_history(large)
+    large_totals = scoring.current_totals(large)
+
+    registry = tables.TableRegistry()
+    table_ids = [registry.create(f"T{i}", [f"P{i}.{j}" for j in range(6)]) for i in range(300)]
+    next_table = itertools.cycle(table_ids).__next__
+
+    totals_12 = [15 * i for i in range(12)]
+
+    # Eight visible hands dealt from one shuffle, all ranked against the deck they leave
+    hands_8, pos = {}, 0
+    for i, size in enumerate([2, 3, 4, 5, 6, 3, 2, 4]):
+        hands_8[f"P{i}"] = shuffled[pos:pos + size]
+        pos += size
+    deck_8 = advisor_logic.pop_from_deck(shuffled[:pos], advisor_logic.build_master_deck_state())
+    totals_8 = {name: 20 * i for i, name in enumerate(hands_8)}
+    win_probability.fresh_round_pmf()  # one-off solve, cached for the process
+
+    # A one-solve table (full deck, hands up to 3 cards) is enough to time a lookup
+    table_path = Path(tempfile.mkdtemp()) / "policy.bin"
+    policy_table.build(str(table_path), hand_cards=3, seen_cards=0)
+    table = policy_table.open_table(str(table_path))
+    deck_2 = advisor_logic.pop_from_deck(["5", "8"], advisor_logic.build_master_deck_state())
+
+    # A sweep over house variants: after the first compile, switching is a dict lookup
+    variants = [DEFAULT_RULES.replace(flip_seven_bonus=bonus, target_score=target) for bonus in (15, 25) for target in (150, 200)]
+    for rules in variants:
+        advisor_logic.compile_rules(rules)
+    next_rules = itertools.cycle(variants).__next__
+
+    raw_score = "3, 5, 9, 12, x2, +4, $"
+    uncached_parse = tokenizer.parse_score.__wrapped__
+
+    return {
+        "build_master_deck": advisor_logic.build_master_deck,
+        "build_master_deck_state": advisor_logic.build_master_deck_state,
+        "pop_from_deck/list_40": lambda: advisor_logic.pop_from_deck(seen_40, master.copy()),
+        "pop_from_deck/state_40": lambda: advisor_logic.pop_from_deck(seen_40, full_state.copy()),
+        "calc_score/3_cards": lambda: advisor_logic.calc_score(hand_3),
+        "calc_score/7_cards": lambda: advisor_logic.calc_score(hand_7),
+        "calc_score/bust": lambda: advisor_logic.calc_score(hand_bust),
+        "calc_score/7_cards_variants": lambda: advisor_logic.calc_score(hand_7, next_rules()),
+        "check_bust/3_cards_full_list": lambda: advisor_logic.check_bust(hand_3, full_list),
+        "check_bust/3_cards_full_state": lambda: advisor_logic.check_bust(hand_3, full_state),
+        "check_bust/7_cards_list": lambda: advisor_logic.check_bust(hand_7, deck_7_list),
+        "check_bust/7_cards_state": lambda: advisor_logic.check_bust(hand_7, deck_7_state),
+        "final_pmf/cold_1_card": _cold(
+            lambda: advisor_logic.final_score_distribution(hand_1, deck_1_state)
+        ),
+        "final_pmf/cold_3_cards_seen_40": _cold(
+            lambda: advisor_logic.final_score_distribution(hand_3, deck_3_seen_40)
+        ),
+        "parse_score_input/cached": lambda: scoring.parse_score_input(raw_score),
+        "parse_score_input/uncached": lambda: uncached_parse(raw_score),
+        "parse_score_input/numbers": lambda: uncached_parse("12 + 30"),
+        "current_totals/4x10": lambda: scoring.current_totals(small),
+        "current_totals/20x300": lambda: scoring.current_totals(large),
+        "win_probabilities/12_players": lambda: win_probability.win_probabilities(totals_12, [None] * 12),
+        "policy_table/lookup_2_cards": lambda: table.lookup(["5", "8"], deck_2),
+        "targeting/8_players": lambda: targeting.rank_targets(hands_8, deck_8, totals_8, "P0"),
+        "commit_undo/20x300": lambda: (scoring.commit_round([5.0] * 20, large), scoring.undo(large)),
+        "tables/commit_and_board_300": lambda: (registry.commit_round(next_table(), [5.0] * 6), registry.leaderboard()),
+        "history_table/20x300": lambda: build_history_table(large["players"], large_history, large_totals).to_html(),
+    }
+
+
+# ---------------------
+# Measurement
+# ---------------------
+def time_case(fn, repeat=7):
+    # Best-of-repeat microseconds per call, with the loop count picked by timeit
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path benchmarks; fails if a case regresses past the baseline.")
+    parser.add_argument("--update", action="store_true", help="write the current timings as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--output", type=Path, help="also write this run's timings to a JSON file")
+    parser.add_argument("-k", dest="pattern", default="", help="only run cases containing this substring")
+    args = parser.parse_args()
+
+    results = {}
+    for name, fn in build_cases().items():
+        if args.pattern in name:
+            results[name] = round(time_case(fn), 3)
+            print(f"{name:<32} {results[name]:12.3f} us")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    over = [
+        f"{name}: {us:.3f} us > {BUDGETS_US[name]:.3f} us budget"
+        for name, us in results.items()
+        if us > BUDGETS_US.get(name, float("inf"))
+    ]
+    for msg in over:
+        print(f"OVER BUDGET {msg}")
+
+    if args.update or not BASELINE.exists():
+        baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        baseline.update(results)
+        BASELINE.parent.mkdir(exist_ok=True)
+        BASELINE.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"baseline written to {BASELINE}")
+        return 1 if over else 0
+
+    baseline = json.loads(BASELINE.read_text())
+    failed = []
+    for name, us in results.items():
+        if name not in baseline:
+            continue
+        limit = baseline[name] * (1 + args.tolerance) + SLACK_US
+        if us > limit:
+            failed.append(f"{name}: {us:.3f} us > {limit:.3f} us allowed")
+    for msg in failed:
+        print(f"REGRESSION {msg}")
+    return 1 if failed or over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
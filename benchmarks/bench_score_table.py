@@ -0,0 +1,62 @@
+# ---------------------
+# Imports
+# ---------------------
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core import advisor_logic  # noqa: E402
+
+
+# ---------------------
+# Benchmark
+# ---------------------
+def random_hands(n, seed=0):
+    rng = random.Random(seed)
+    master = advisor_logic.build_master_deck()
+    hands = []
+    for _ in range(n):
+        deck = master.copy()
+        rng.shuffle(deck)
+        hands.append(deck[: rng.randint(1, 8)])
+    return hands
+
+
+def time_fn(fn, hands, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for hand in hands:
+            fn(hand)
+        best = min(best, time.perf_counter() - start)
+    return best / len(hands)
+
+
+def main(n=20000):
+    hands = random_hands(n)
+
+    start = time.perf_counter()
+    advisor_logic.score_table()
+    build = time.perf_counter() - start
+
+    for hand in hands:
+        assert advisor_logic.calc_score(hand) == advisor_logic._calc_score_cards(hand), hand
+
+    keys = [advisor_logic.hand_key(hand) for hand in hands]
+    table = advisor_logic.score_table()
+
+    legacy = time_fn(advisor_logic._calc_score_cards, hands)
+    wrapper = time_fn(advisor_logic.calc_score, hands)
+    lookup = time_fn(table.__getitem__, keys)
+
+    print(f"table build (once):      {build * 1e3:8.1f} ms")
+    print(f"legacy calc_score:       {legacy * 1e9:8.0f} ns/hand")
+    print(f"calc_score (table):      {wrapper * 1e9:8.0f} ns/hand  ({legacy / wrapper:4.1f}x)")
+    print(f"pre-encoded key lookup:  {lookup * 1e9:8.0f} ns/hand  ({legacy / lookup:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# ---------------------
+# Imports
+# ---------------------
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).resolve().parent / "baselines" / "startup.json"
+
+# Entry points whose cold import cost users feel
+MODULES = ["app", "src.pages.advisor", "src.pages.scorer", "src.core.advisor_logic"]
+TOLERANCE = 0.25  # allowed fractional regression
+SLACK_MS = 30.0  # absorbs noise on small imports
+
+
+# ---------------------
+# Measurement
+# ---------------------
+def import_times(module):
+    """Cumulative import time (ms) of `module` and everything it pulls in, from a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def measure(repeat=3):
+    # Best of `repeat` runs per module, to drop OS cache noise
+    results = {}
+    for module in MODULES:
+        best = None
+        heavy = {}
+        for _ in range(repeat):
+            times = import_times(module)
+            if best is None or times[module] < best:
+                best = times[module]
+                heavy = {name: t for name, t in times.items() if name.count(".") == 0 and t >= 20}
+        results[module] = {"ms": round(best, 1), "top_level": dict(sorted(heavy.items(), key=lambda x: -x[1]))}
+    return results
+
+
+# ---------------------
+# Main
+# ---------------------
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark; fails if an entry point regresses.")
+    parser.add_argument("--update", action="store_true", help="write the current timings as the new baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = measure(args.repeat)
+    for module, r in results.items():
+        deps = ", ".join(f"{name} {t:.0f}" for name, t in r["top_level"].items())
+        print(f"{module:<26} {r['ms']:8.1f} ms   ({deps})")
+
+    if args.update or not BASELINE.exists():
+        BASELINE.parent.mkdir(exist_ok=True)
+        BASELINE.write_text(json.dumps({m: r["ms"] for m, r in results.items()}, indent=2) + "\n")
+        print(f"baseline written to {BASELINE}")
+        return 0
+
+    baseline = json.loads(BASELINE.read_text())
+    failed = []
+    for module, r in results.items():
+        limit = baseline.get(module, float("inf")) * (1 + TOLERANCE) + SLACK_MS
+        if r["ms"] > limit:
+            failed.append(f"{module}: {r['ms']:.1f} ms > {limit:.1f} ms allowed")
+    for msg in failed:
+        print(f"REGRESSION {msg}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
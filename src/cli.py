@@ -0,0 +1,182 @@
+# ---------------------
+# Imports
+# ---------------------
+import argparse
+import json
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from src.core.advisor_logic import CARD_KINDS, KIND_INDEX, check_bust_batch
+from src.core.scoring import parse_score_input
+from src.core.tokenizer import CARD_ALIASES, normalize_card, tokenize
+
+# ---------------------
+# Settings
+# ---------------------
+BATCH_SIZE = 4096  # lines per batch; memory is bounded by batch size x batches in flight
+
+_loads = json.JSONDecoder().decode
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+# Output lines are %-formatted rather than json-encoded: it's a third of the cost
+# per line, and %r of a finite float is exactly what json writes for it (NaN and
+# infinities aren't JSON, so they are written as null)
+_ADVICE_FORMAT = (
+    '{"current_score":%d,"recommendation":"%s","expected_value":%r,"bust_chance":%r,"event_chance":%r%s}'
+)
+_ADVICE_NULLABLE_FORMAT = _ADVICE_FORMAT.replace("%r", "%s")
+_CARD_INDEX = {**KIND_INDEX, **{alias: KIND_INDEX[card] for alias, card in CARD_ALIASES.items()}}
+
+
+# ---------------------
+# Records
+# ---------------------
+# One JSON object per line:
+#   {"drawn": "5, 8, x2", "seen": "11, 12"}  -> advice (seen/drawn are removed from a full deck)
+#   {"score": "3, 5, 9, x2"}                  -> score of a Scorer input string
+# Cards may be a comma-separated string (Advisor input syntax) or a list. An "id"
+# field is echoed back so results can be joined to their input.
+def _card_indices(value):
+    # CARD_KINDS index of every recognised card; unknown tokens are dropped, as in the Advisor
+    if value is None:
+        return []
+    if isinstance(value, str):
+        # Fast path for clean "5, 8, x2" input: split and look up entirely in C
+        indices = list(map(_CARD_INDEX.get, value.replace(" ", "").split(",")))
+        if None not in indices:
+            return indices
+        value = tokenize(value)[0]
+    else:
+        indices = list(map(_CARD_INDEX.get, value))
+        if None not in indices:
+            return indices
+    indices = (_CARD_INDEX.get(normalize_card(str(card).strip().lower())) for card in value)
+    return [idx for idx in indices if idx is not None]
+
+
+def _id_suffix(ident):
+    # Integer ids (the common case) skip the encoder
+    return ',"id":%d' % ident if type(ident) is int else ',"id":' + _dumps(ident)
+
+
+def _number(value):
+    return repr(value) if math.isfinite(value) else "null"
+
+
+def _counts(indices, lengths):
+    # (n, len(CARD_KINDS)) count array from every row's card indices, concatenated, in one bincount
+    width = len(CARD_KINDS)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    flat = rows * width + np.asarray(indices, dtype=np.int64)
+    return np.bincount(flat, minlength=len(lengths) * width).reshape(len(lengths), width)
+
+
+def process_batch(lines):
+    """Turn a list of JSONL input lines into a list of JSONL output lines, in order."""
+    results = [None] * len(lines)
+    advice_rows, advice_ids = [], []
+    drawn_idx, drawn_len, seen_idx, seen_len = [], [], [], []
+
+    for row, line in enumerate(lines):
+        suffix = ""
+        try:
+            record = _loads(line)
+            suffix = _id_suffix(record["id"]) if "id" in record else ""
+            if "score" in record:
+                results[row] = '{"score":%s%s}' % (_number(parse_score_input(record["score"])), suffix)
+            elif "drawn" in record:
+                drawn = _card_indices(record["drawn"])
+                seen = _card_indices(record.get("seen"))
+                drawn_idx += drawn
+                drawn_len.append(len(drawn))
+                seen_idx += seen
+                seen_len.append(len(seen))
+                advice_rows.append(row)
+                advice_ids.append(suffix)
+            else:
+                results[row] = '{"error":"expected a \'drawn\' or \'score\' field"%s}' % suffix
+        except (ValueError, TypeError, AttributeError) as exc:
+            results[row] = '{"error":%s%s}' % (_dumps(f"bad record: {exc}"), suffix)
+
+    # Advice for the whole batch in one vectorized call
+    if advice_rows:
+        advice = check_bust_batch(_counts(drawn_idx, drawn_len), _counts(seen_idx, seen_len))
+        floats = [advice[name] for name in ("expected_value", "bust_chance", "event_chance")]
+        finite = np.logical_and.reduce([np.isfinite(column) for column in floats])
+        columns = zip(
+            advice["current_score"].tolist(),
+            advice["recommendation"].tolist(),
+            *(column.tolist() for column in floats),
+            advice_ids,
+        )
+        for row, ok, values in zip(advice_rows, finite.tolist(), columns):
+            if not ok:
+                score, recommendation, *numbers, suffix = values
+                values = (score, recommendation, *map(_number, numbers), suffix)
+            results[row] = (_ADVICE_FORMAT if ok else _ADVICE_NULLABLE_FORMAT) % values
+
+    return results
+
+
+# ---------------------
+# Pipeline
+# ---------------------
+def read_batches(stream, batch_size=BATCH_SIZE):
+    lines = (line for line in stream if line.strip())
+    while True:
+        batch = list(islice(lines, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def map_batches(batches, workers=1):
+    """process_batch over `batches`, yielding results in input order.
+
+    With several workers only 2 batches per worker are in flight, so a slow
+    consumer or an endless stdin never piles up results in memory.
+    """
+    if workers <= 1:
+        yield from map(process_batch, batches)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(process_batch, batch))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run(stdin, stdout, workers=1, batch_size=BATCH_SIZE):
+    count = 0
+    for out in map_batches(read_batches(stdin, batch_size), workers):
+        stdout.write("\n".join(out))
+        stdout.write("\n")
+        count += len(out)
+    stdout.flush()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stream JSONL advice/score requests from stdin to JSONL results on stdout (no Streamlit)."
+    )
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (0 = one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    run(sys.stdin, sys.stdout, workers, args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,10 @@
-from . import scoring
+import importlib
 
-__all__ = ["scoring"]
\ No newline at end of file
+__all__ = ["scoring"]
+
+
+def __getattr__(name):
+    # Lazy so the pure logic modules (advisor_logic, ...) load without Streamlit
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,28 +1,285 @@
 # ---------------------
 # Imports
 # ---------------------
+import threading
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+from src.core.perf import instrument
+from src.core.rules import DEFAULT_RULES
+
+# ---------------------
+# Card Kinds
+# ---------------------
+# Ordered like build_master_deck() so count-based and list-based decks iterate identically
+CARD_KINDS = tuple(str(i) for i in range(13)) + ("sc", "f3", "fr", "+2", "+4", "+6", "+8", "+10", "x2")
+KIND_INDEX = {card: idx for idx, card in enumerate(CARD_KINDS)}
+NUMBER_KINDS = range(13)
+MODIFIER_KINDS = range(KIND_INDEX["+2"], KIND_INDEX["+10"] + 1)
+X2_INDEX = KIND_INDEX["x2"]
+SC_INDEX = KIND_INDEX["sc"]
+EVENT_CARDS = ("sc", "f3", "fr")
+
+
+class DeckState:
+    """Multiset of cards stored as one count per entry of CARD_KINDS.
+
+    Drawing and undrawing are O(1); the counts hash and compare by value so a
+    DeckState can key a memo table. Iterating yields the cards like a list deck.
+    """
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self, counts=None):
+        self.counts = array("B", counts if counts is not None else bytes(len(CARD_KINDS)))
+        self.total = sum(self.counts)
+
+    @classmethod
+    def from_cards(cls, cards):
+        state = cls()
+        for card in cards:
+            state.undraw(card)
+        return state
+
+    def draw(self, card):
+        idx = KIND_INDEX.get(str(card))
+        if idx is None or self.counts[idx] == 0:
+            return False
+        self.counts[idx] -= 1
+        self.total -= 1
+        return True
+
+    def undraw(self, card):
+        idx = KIND_INDEX.get(str(card))
+        if idx is None:
+            return False
+        self.counts[idx] += 1
+        self.total += 1
+        return True
+
+    def count(self, card):
+        idx = KIND_INDEX.get(str(card))
+        return 0 if idx is None else self.counts[idx]
+
+    def items(self):
+        return [(CARD_KINDS[idx], n) for idx, n in enumerate(self.counts) if n]
+
+    def to_list(self):
+        return [CARD_KINDS[idx] for idx, n in enumerate(self.counts) for _ in range(n)]
+
+    def copy(self):
+        return DeckState(self.counts)
+
+    def key(self):
+        return self.counts.tobytes()
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __contains__(self, card):
+        return self.count(card) > 0
+
+    def __eq__(self, other):
+        if not isinstance(other, DeckState):
+            return NotImplemented
+        return self.counts == other.counts
+
+    def __hash__(self):
+        return hash(self.counts.tobytes())
+
+    def __repr__(self):
+        return f"DeckState({dict(self.items())})"
+
+
+# ---------------------
+# Score Lookup Table
+# ---------------------
+# A legal hand is fully described by which numbers it holds (13 bits), which
+# modifiers it holds (+2, +4, +6, +8, +10, x2 -> 6 bits) and whether a number
+# repeated (bust bit). hand_key() packs that into one int indexing score_table().
+# Each Second Chance in the hand absorbs one repeat (the duplicate and the `sc`
+# are both discarded), so a hand only busts on more repeats than `sc` cards.
+NUMBER_BITS = 13
+MODIFIER_BITS = 6
+BUST_SHIFT = NUMBER_BITS + MODIFIER_BITS
+SCORE_TABLE_SIZE = 1 << (BUST_SHIFT + 1)
+
+_NUMBER_BIT = {str(i): 1 << i for i in NUMBER_KINDS}
+_MODIFIER_BIT = {card: 1 << (NUMBER_BITS + i) for i, card in enumerate(("+2", "+4", "+6", "+8", "+10", "x2"))}
+_BUST_BIT = 1 << BUST_SHIFT
+
+_score_table = None  # DEFAULT_RULES table, kept on the side for calc_score
+_score_tables = {}  # (flip_seven_bonus, multiplier) -> table, shared by rulesets that score alike
+
+
+def _build_score_table(flip_seven_bonus, multiplier):
+    num_sums = [sum(i for i in NUMBER_KINDS if mask >> i & 1) for mask in range(1 << NUMBER_BITS)]
+    bonuses = [flip_seven_bonus if bin(mask).count("1") == 7 else 0 for mask in range(1 << NUMBER_BITS)]
+    if max(num_sums) * multiplier + 30 + flip_seven_bonus > 0xFFFF:
+        raise ValueError("Flip 7 bonus and multiplier are too large for the score table")
+
+    # Bust half of the table stays zero
+    table = array("H", bytes(2 * SCORE_TABLE_SIZE))
+    for mod_mask in range(1 << MODIFIER_BITS):
+        mod = sum(2 * (i + 1) for i in range(5) if mod_mask >> i & 1)
+        double = multiplier if mod_mask >> 5 & 1 else 1
+        start = mod_mask << NUMBER_BITS
+        table[start:start + (1 << NUMBER_BITS)] = array(
+            "H", [s * double + mod + b for s, b in zip(num_sums, bonuses)]
+        )
+    return table
+
+
+def score_table(rules=None):
+    """Return the hand-key -> score table for `rules` (default DEFAULT_RULES), building it on first use."""
+    global _score_table
+    if rules is None:
+        if _score_table is None:
+            _score_table = compile_rules().score_table
+        return _score_table
+    return compile_rules(rules).score_table
+
+
+# ---------------------
+# Compiled Rules
+# ---------------------
+# Everything derived from a Ruleset is built once per distinct ruleset and kept,
+# so a sweep over variants only pays for each variant the first time. Score
+# tables (2 MB each) depend only on the bonus and multiplier and are shared
+# across rulesets that differ in deck or target. Bust sets need no table of
+# their own: a hand busts on the numbers set in its key, whatever the ruleset.
+class CompiledRules:
+    """Derived tables for one Ruleset: master deck counts (indexed like CARD_KINDS) and the score lookup."""
+
+    __slots__ = ("rules", "counts", "master_deck", "master_counts", "scoring", "_table")
+
+    def __init__(self, rules):
+        copies = dict(rules.deck)
+        self.rules = rules
+        self.counts = tuple(copies[card] for card in CARD_KINDS)
+        if max(self.counts) > 0xFF:
+            raise ValueError("A ruleset deck can hold at most 255 copies of a card")
+        self.master_deck = DeckState(self.counts)
+        self.master_counts = np.array(self.counts, dtype=np.int64)
+        self.master_counts.setflags(write=False)
+        self.scoring = (rules.flip_seven_bonus, rules.multiplier)
+        self._table = None
+
+    @property
+    def score_table(self):
+        # Built on first use, so deck-only callers (e.g. at import) never pay for it
+        if self._table is None:
+            table = _score_tables.get(self.scoring)
+            if table is None:
+                table = _score_tables[self.scoring] = _build_score_table(*self.scoring)
+            self._table = table
+        return self._table
+
+
+_compiled_rules = {}
+_default_rules = None
+
+
+def compile_rules(rules=None):
+    """Return the CompiledRules for `rules` (default DEFAULT_RULES), compiling each ruleset once."""
+    global _default_rules
+    if rules is None:
+        if _default_rules is None:
+            _default_rules = compile_rules(DEFAULT_RULES)
+        return _default_rules
+    compiled = _compiled_rules.get(rules)
+    if compiled is None:
+        compiled = _compiled_rules[rules] = CompiledRules(rules)
+    return compiled
+
+
+def hand_key(drawn):
+    """Pack a hand into its SCORE_TABLE index, or None if it is not a legal hand."""
+    if isinstance(drawn, DeckState):
+        counts = drawn.counts
+        key = 0
+        repeats = 0
+        for num in NUMBER_KINDS:
+            if counts[num] > 1:
+                repeats += counts[num] - 1
+            if counts[num]:
+                key |= 1 << num
+        if repeats > counts[SC_INDEX]:
+            key |= _BUST_BIT
+        for idx in MODIFIER_KINDS:
+            if counts[idx] > 1:
+                return None
+            if counts[idx]:
+                key |= _MODIFIER_BIT[CARD_KINDS[idx]]
+        if counts[X2_INDEX] > 1:
+            return None
+        if counts[X2_INDEX]:
+            key |= _MODIFIER_BIT["x2"]
+        return key
+
+    key = 0
+    spare = 0  # Second Chances not yet used up by a repeat
+    for item in drawn:
+        bit = _NUMBER_BIT.get(item)
+        if bit is not None:
+            if key & bit:
+                spare -= 1
+            key |= bit
+            continue
+        bit = _MODIFIER_BIT.get(item)
+        if bit is None:
+            if item == "sc":
+                spare += 1
+            elif item not in EVENT_CARDS:
+                return None
+            continue
+        if key & bit:
+            return None
+        key |= bit
+    if spare < 0:
+        key |= _BUST_BIT
+    return key
+
+
+def holds_second_chance(drawn):
+    """Whether the hand still holds a Second Chance (more `sc` cards than repeated numbers)."""
+    if isinstance(drawn, DeckState):
+        counts = drawn.counts
+        return counts[SC_INDEX] > sum(counts[num] - 1 for num in NUMBER_KINDS if counts[num] > 1)
+    seen = set()
+    spare = 0
+    for item in drawn:
+        if item == "sc":
+            spare += 1
+        elif item in _NUMBER_BIT:
+            if item in seen:
+                spare -= 1
+            seen.add(item)
+    return spare > 0
+
 
 # ---------------------
 # Advisor Functions
 # ---------------------
-def build_master_deck():
-    deck = []
-    for i in range(13):
-        if i > 1:
-            for j in range(i):
-                deck.append(str(i))
-        else:
-            deck.append(str(i))
-    for card in ["sc", "f3", "fr"]:
-        for _ in range(3):
-            deck.append(card)
-    for i in range(2, 11, 2):
-        deck.append(f"+{i}")
-    deck.append("x2")
-    return deck
+def build_master_deck(rules=None):
+    return [card for card, count in zip(CARD_KINDS, compile_rules(rules).counts) for _ in range(count)]
+
+
+def build_master_deck_state(rules=None):
+    return compile_rules(rules).master_deck.copy()
 
 
 def pop_from_deck(ls, deck):
+    if isinstance(deck, DeckState):
+        for item in ls:
+            # Cards not in the deck are ignored, same as the list path
+            deck.draw(item)
+        return deck
     for item in ls:
         try:
             deck.remove(str(item))
@@ -32,8 +289,31 @@ def pop_from_deck(ls, deck):
     return deck
 
 
-def calc_score(drawn):
+def _calc_score_counts(counts, rules=None):
+    rules = rules or DEFAULT_RULES
+    sum_score = 0
+    unique = 0
+    repeats = 0
+    for num in NUMBER_KINDS:
+        n = counts[num]
+        if n > 1:
+            repeats += n - 1
+        if n:
+            unique += 1
+            sum_score += num
+    if repeats > counts[SC_INDEX]:
+        return 0
+
+    mod = sum(int(CARD_KINDS[idx]) * counts[idx] for idx in MODIFIER_KINDS)
+    double = rules.multiplier if counts[X2_INDEX] else 1
+    flipped = 1 if unique == 7 else 0
+    return (sum_score * double) + mod + (flipped * rules.flip_seven_bonus)
+
+
+def _calc_score_cards(drawn, rules=None):
+    rules = rules or DEFAULT_RULES
     relevant_nums = [item for item in drawn if item not in ["sc", "f3", "fr"]]
+    second_chances = drawn.count("sc")
 
     flip_seven = []
     sum_score = 0
@@ -43,12 +323,16 @@ def calc_score(drawn):
 
     for item in relevant_nums:
         if "x" in item:
-            double = 2
+            double = rules.multiplier
         elif "+" in item:
             mod += int(item.strip("+"))
         else:
             if item in flip_seven:
-                return 0
+                # A Second Chance discards the repeat instead
+                if not second_chances:
+                    return 0
+                second_chances -= 1
+                continue
             else:
                 flip_seven.append(item)
             sum_score += int(item)
@@ -56,15 +340,31 @@ def calc_score(drawn):
     if len(flip_seven) == 7:
         flipped = 1
 
-    final = (sum_score * double) + mod + (flipped * 15)
+    final = (sum_score * double) + mod + (flipped * rules.flip_seven_bonus)
     return final
 
 
-def check_bust(drawn, deck):
+def calc_score(drawn, rules=None):
+    key = hand_key(drawn)
+    if key is None:
+        # Not a legal hand (repeated modifier or unknown token); score it the long way
+        if isinstance(drawn, DeckState):
+            return _calc_score_counts(drawn.counts, rules)
+        return _calc_score_cards(drawn, rules)
+    return ((_score_table if rules is None else None) or score_table(rules))[key]
+
+
+@instrument("check_bust")
+def check_bust(drawn, deck, rules=None):
+    if isinstance(drawn, DeckState):
+        drawn = drawn.to_list()
     drawn = [str(item) for item in drawn]
 
     # Current score
-    curr_score = calc_score(drawn)
+    curr_score = calc_score(drawn, rules)
+    has_sc = holds_second_chance(drawn)
+    key = hand_key(drawn)
+    busted = key is not None and bool(key & _BUST_BIT)  # a later `sc` can't undo a bust
 
     # Count unique base numbers (not +n, x2, or events)
     unique_nums = set()
@@ -76,12 +376,15 @@ def check_bust(drawn, deck):
 
     # Counting cards left
     cards_left = len(deck)
-    deck_counter = {}
-    for item in deck:
-        if item not in deck_counter.keys():
-            deck_counter[item] = 1
-        else:
-            deck_counter[item] += 1
+    if isinstance(deck, DeckState):
+        deck_counter = dict(deck.items())
+    else:
+        deck_counter = {}
+        for item in deck:
+            if item not in deck_counter.keys():
+                deck_counter[item] = 1
+            else:
+                deck_counter[item] += 1
 
     # Finding expected value
     expected_values_data = []
@@ -90,7 +393,7 @@ def check_bust(drawn, deck):
         temp = drawn.copy()
         temp.append(k)
         temp_perc = v / cards_left
-        temp_total = calc_score(temp)
+        temp_total = 0 if busted else calc_score(temp, rules)
         delta = temp_total - curr_score
         expected_value = temp_perc * delta
         total_expected_value += expected_value
@@ -99,10 +402,11 @@ def check_bust(drawn, deck):
     expected_values_data = sorted(expected_values_data, key=lambda x: x[4], reverse=True)
     recommendation = "HIT" if total_expected_value > 0 else "STAY"
 
-    # Checking busts
+    # Checking busts (a held Second Chance absorbs the next repeat, so nothing busts).
+    # A number already repeated in a busted hand counts once, as in check_bust_batch
     bustable = []
     bust_total = 0
-    for item in drawn:
+    for item in [] if has_sc else dict.fromkeys(drawn):
         if item not in ["sc", "f3", "fr"]:
             try:
                 perc = deck_counter[item] / cards_left
@@ -135,4 +439,390 @@ def check_bust(drawn, deck):
         "events": events,
         "unique_numbers": unique_count,
         "has_flip_seven": has_flip_seven,
+        "has_second_chance": has_sc,
+    }
+
+
+# ---------------------
+# Optimal Stopping Solver
+# ---------------------
+# Exact DP over every (number mask, modifier mask) reachable from a hand. Action
+# cards are score-neutral here, as in check_bust, so a draw is conditioned on the
+# next number/modifier card. Only cards still in the deck and not already held
+# can be added, so states are the 2^n subsets of those n "free" cards; they are
+# solved a popcount layer at a time with NumPy. States with seven numbers end the
+# round and need no sweep, which roughly halves the work from a short hand.
+#
+# Second Chance adds a phase to each subset:
+#   GAIN  - not holding one; drawing `sc` moves to HELD, a repeat busts
+#   HELD  - a repeat is discarded with the `sc` (to SPENT); another `sc` is
+#           passed on, so it is skipped like the action cards
+#   SPENT - not holding one and none to gain: the plain solver (also GAIN when
+#           the deck has no `sc` left)
+# Each phase only leads to later ones at the same subset, so they are solved
+# SPENT, HELD, GAIN, each as one more backward pass. Along a path the deck
+# counts ignore the discarded repeat and the `sc` drawn, and a spent Second
+# Chance isn't regained in the same round; all three are rare enough to leave out.
+SOLVER_CACHE_SIZE = 16  # solved values / PMFs (up to a few MB each for a one-card hand)
+SPACE_CACHE_SIZE = 4  # state spaces are the largest objects, so keep only the latest few
+GAIN, HELD, SPENT = 0, 1, 2
+
+_SOLVER_KINDS = list(NUMBER_KINDS) + list(MODIFIER_KINDS) + [X2_INDEX]
+_solver_cache = OrderedDict()
+_space_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_in_flight = {}  # (cache id, key) -> Event set once that build finishes
+
+
+class _StateSpace:
+    """Every hand reachable from `root` with `deck_counts`, indexed by subset of free cards and phase."""
+
+    __slots__ = (
+        "root", "phase", "scoring", "sc_count", "free", "free_counts", "layers", "stay", "bust", "total", "playing",
+    )
+
+    def __init__(self, root, deck_counts, has_sc=False, rules=None):
+        compiled = compile_rules(rules)
+        self.root = root
+        self.scoring = compiled.scoring
+        self.sc_count = deck_counts[SC_INDEX]
+        self.phase = HELD if has_sc else GAIN if self.sc_count else SPENT
+        self.free = []
+        self.free_counts = []
+        for b, idx in enumerate(_SOLVER_KINDS):
+            if not root >> b & 1 and deck_counts[idx]:
+                self.free.append(b)
+                self.free_counts.append(deck_counts[idx])
+
+        # Built by doubling: free card i appends a copy of every array with card i held.
+        # Cards held at the root that are still in the deck are bust mass for every state.
+        held_bust = float(sum(deck_counts[num] for num in NUMBER_KINDS if root >> num & 1))
+        keys = np.array([root], dtype=np.int64)
+        bust = np.array([held_bust])
+        total = np.array([held_bust + sum(self.free_counts)])
+        size = np.zeros(1, dtype=np.int8)
+        numbers = np.array([bin(root & ((1 << NUMBER_BITS) - 1)).count("1")], dtype=np.int8)
+        for b, count in zip(self.free, self.free_counts):
+            is_number = b < NUMBER_BITS
+            keys = np.concatenate([keys, keys | (1 << b)])
+            # A drawn number's other copies turn into bust mass; a modifier leaves the deck
+            bust = np.concatenate([bust, bust + (count - 1 if is_number else 0)])
+            total = np.concatenate([total, total - (1 if is_number else count)])
+            size = np.concatenate([size, size + 1])
+            numbers = np.concatenate([numbers, numbers + is_number])
+
+        self.stay = np.frombuffer(compiled.score_table, dtype=np.uint16)[keys]
+        self.bust = bust
+        self.total = total
+        self.playing = numbers < 7
+        # Seven numbers end the round, so only states still playing are swept, grouped by free cards held
+        live = np.flatnonzero(self.playing)
+        live = live[np.argsort(size[live], kind="stable")]
+        bounds = np.searchsorted(size[live], np.arange(len(self.free) + 2))
+        self.layers = [live[bounds[k]:bounds[k + 1]] for k in range(len(self.free) + 1)]
+
+    def phases(self):
+        """Phases reachable from the root, in solve order."""
+        return {GAIN: (SPENT, HELD, GAIN), HELD: (SPENT, HELD), SPENT: (SPENT,)}[self.phase]
+
+    def _draws(self, phase):
+        # (weight, phase) of the draw that keeps the subset, and the extra cards in the total
+        if phase == HELD:
+            return self.bust, SPENT, 0
+        if phase == GAIN:
+            return self.sc_count, HELD, self.sc_count
+        return None, None, 0
+
+    def index(self, card):
+        """Subset index after drawing `card` from the root, or None if it repeats a held number."""
+        if card in EVENT_CARDS:
+            return 0
+        bit = (_NUMBER_BIT.get(card) or _MODIFIER_BIT[card]).bit_length() - 1
+        if bit not in self.free:
+            return None
+        return 1 << self.free.index(bit)
+
+    def solve(self):
+        # Backward pass: value of playing optimally, and of hitting, in every (phase, state).
+        # Phases share one sweep over the layers so each layer's successor indices are built once.
+        phases = self.phases()
+        values = {phase: self.stay.astype(np.float64) for phase in phases}
+        hits = {phase: np.zeros(len(self.stay)) for phase in phases}
+        for layer in reversed(self.layers):
+            if not len(layer):
+                continue
+            successors = [(layer | (1 << i), float(count)) for i, count in enumerate(self.free_counts)]
+            stay = self.stay[layer]
+            layer_total = self.total[layer]
+            gathered = np.empty(len(layer))
+            for phase in phases:
+                weight, same, extra = self._draws(phase)
+                v = values[phase]
+                v[layer] = 0.0  # a held card maps a state to itself, so it must add nothing
+                acc = np.zeros(len(layer))
+                for succ, count in successors:
+                    np.take(v, succ, out=gathered)
+                    gathered *= count
+                    acc += gathered
+                if weight is not None:
+                    acc += (weight[layer] if phase == HELD else weight) * values[same][layer]
+                total = layer_total + extra
+                np.divide(acc, total, out=acc, where=total > 0)
+                acc[total <= 0] = 0.0  # nothing left to draw
+                hits[phase][layer] = acc
+                v[layer] = np.maximum(stay, acc)
+        return values, hits
+
+    def distribution(self, hit_masks):
+        # Forward pass: push probability from the root through states where hit_masks[phase] says hit
+        order = self.phases()[::-1]  # GAIN feeds HELD feeds SPENT at the same subset
+        mass = {phase: np.zeros(len(self.stay)) for phase in order}
+        mass[self.phase][0] = 1.0
+        pmf = np.zeros(int(self.stay.max()) + 1)
+        bust = 0.0
+        for layer in self.layers:
+            for phase in order:
+                weight, same, extra = self._draws(phase)
+                m = mass[phase][layer]
+                hitting = hit_masks[phase][layer] & (self.total[layer] + extra > 0)
+                staying = ~hitting & (m > 0)
+                pmf += np.bincount(self.stay[layer[staying]], weights=m[staying], minlength=len(pmf))
+
+                hitting &= m > 0
+                sub = layer[hitting]
+                m = m[hitting] / (self.total[sub] + extra)
+                if phase == HELD:
+                    mass[SPENT][sub] += m * self.bust[sub]
+                else:
+                    bust += (m * self.bust[sub]).sum()
+                if phase == GAIN:
+                    mass[HELD][sub] += m * self.sc_count
+                # A held card maps a state to itself, whose mass has already been used
+                target = mass[phase]
+                for i, count in enumerate(self.free_counts):
+                    target[sub | (1 << i)] += m * count
+        # States with seven numbers end the round with whatever reached them
+        done = ~self.playing
+        for phase in order:
+            pmf += np.bincount(self.stay[done], weights=mass[phase][done], minlength=len(pmf))
+        pmf[0] += bust
+        return pmf, float(bust)
+
+
+def _state_space(drawn, deck, rules=None):
+    if not isinstance(deck, DeckState):
+        deck = DeckState.from_cards(deck)
+    root = hand_key(drawn)
+    if root is None or root & _BUST_BIT:
+        return None, deck
+    has_sc = holds_second_chance(drawn)
+    space = _cached(
+        (root, has_sc, deck.key(), compile_rules(rules).scoring),
+        lambda: _StateSpace(root, deck.counts, has_sc, rules),
+        _space_cache,
+        SPACE_CACHE_SIZE,
+    )
+    return space, deck
+
+
+def _cached(cache_key, build, cache=_solver_cache, max_size=SOLVER_CACHE_SIZE):
+    # Small LRU shared by the Advisor's job threads: most recent at the end, oldest
+    # evicted first. A key being built is built once; other callers wait for it.
+    flight_key = (id(cache), cache_key)
+    while True:
+        with _cache_lock:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                cache.move_to_end(cache_key)
+                return cached
+            pending = _in_flight.get(flight_key)
+            if pending is None:
+                pending = _in_flight[flight_key] = threading.Event()
+                break
+        pending.wait()  # then retry: it may have failed or already been evicted
+
+    try:
+        result = build()
+        with _cache_lock:
+            cache[cache_key] = result
+            if len(cache) > max_size:
+                cache.popitem(last=False)
+    finally:
+        with _cache_lock:
+            del _in_flight[flight_key]
+        pending.set()
+    return result
+
+
+def _solved(space, deck):
+    return _cached(("solve", space.root, space.phase, space.scoring, deck.key()), space.solve)
+
+
+def solve_optimal_stopping(drawn, deck, rules=None):
+    """Exact optimal HIT/STAY policy for the rest of the round.
+
+    Returns the recommendation, the value of playing optimally from here, the
+    stay and hit values, and the best action after each possible next card.
+    Hands are scored under `rules` (DEFAULT_RULES if omitted).
+    """
+    if not isinstance(drawn, DeckState):
+        drawn = [str(item) for item in drawn]
+    space, deck = _state_space(drawn, deck, rules)
+    if space is None:
+        curr_score = calc_score(drawn, rules)
+        return {
+            "recommendation": "STAY",
+            "value": curr_score,
+            "stay_value": curr_score,
+            "hit_value": 0.0,
+            "next_card_policy": [],
+        }
+
+    values, hits = _solved(space, deck)
+    phase = space.phase
+    recommendation = "HIT" if hits[phase][0] > space.stay[0] else "STAY"
+
+    next_card_policy = []
+    cards_left = len(deck)
+    for card, count in deck.items():
+        j, after = space.index(card), phase
+        if card == "sc" and phase == GAIN:
+            after = HELD
+        elif j is None:
+            if phase != HELD:
+                next_card_policy.append((card, count / cards_left, 0.0, "BUST"))
+                continue
+            j, after = 0, SPENT  # the Second Chance takes the repeat
+        action = "HIT" if hits[after][j] > space.stay[j] else "STAY"
+        next_card_policy.append((card, count / cards_left, float(values[after][j]), action))
+    next_card_policy = sorted(next_card_policy, key=lambda x: x[2], reverse=True)
+
+    return {
+        "recommendation": recommendation,
+        "value": float(values[phase][0]),
+        "stay_value": float(space.stay[0]),
+        "hit_value": float(hits[phase][0]),
+        "next_card_policy": next_card_policy,
+    }
+
+
+def final_score_distribution(drawn, deck, stay_rule="optimal", force_hit=False, rules=None):
+    """Exact probability mass function of the round's final score from here.
+
+    `stay_rule` is "optimal" (the solve_optimal_stopping policy) or an int: keep
+    hitting until the round score reaches it. `force_hit` takes the next card
+    regardless and applies the rule after; `rules` as in solve_optimal_stopping.
+    Returns the PMF as a NumPy array indexed by score (bust counts as 0) plus
+    bust chance and expected score.
+    """
+    if not isinstance(drawn, DeckState):
+        drawn = [str(item) for item in drawn]
+    space, deck = _state_space(drawn, deck, rules)
+    if space is None:
+        return {"pmf": np.ones(1), "bust_chance": 1.0, "expected_score": 0.0}
+
+    def build():
+        if stay_rule == "optimal":
+            _, hits = _solved(space, deck)
+            hit_masks = {phase: hits[phase] > space.stay for phase in space.phases()}
+        else:
+            hit_masks = dict.fromkeys(space.phases(), space.stay < stay_rule)
+        if force_hit:
+            hit_masks[space.phase] = hit_masks[space.phase].copy()
+            hit_masks[space.phase][0] = True
+        return space.distribution(hit_masks)
+
+    # Staying can score 0 too, so bust mass is tracked on the side
+    pmf, bust = _cached(("pmf", space.root, space.phase, space.scoring, deck.key(), stay_rule, force_hit), build)
+    return {
+        "pmf": pmf,
+        "bust_chance": bust,
+        "expected_score": float(np.arange(len(pmf)) @ pmf),
+    }
+
+
+# ---------------------
+# Batch Advisor
+# ---------------------
+_NUMBER_VALUES = np.arange(13)
+_MODIFIER_VALUES = np.array([int(CARD_KINDS[idx]) for idx in MODIFIER_KINDS])
+_EVENT_INDICES = [KIND_INDEX[card] for card in EVENT_CARDS]
+
+
+def cards_to_counts(hands):
+    """Stack card lists (or DeckStates) into an (n, len(CARD_KINDS)) count array."""
+    counts = np.zeros((len(hands), len(CARD_KINDS)), dtype=np.int64)
+    for row, hand in enumerate(hands):
+        if isinstance(hand, DeckState):
+            counts[row] = hand.counts
+            continue
+        for card in hand:
+            idx = KIND_INDEX.get(str(card))
+            if idx is not None:
+                counts[row, idx] += 1
+    return counts
+
+
+def _batch_score_parts(counts, multiplier=DEFAULT_RULES.multiplier):
+    # Pieces of calc_score for each row of a count array
+    numbers = counts[:, : len(NUMBER_KINDS)]
+    held = numbers > 0
+    num_sum = held @ _NUMBER_VALUES
+    unique = held.sum(axis=1)
+    mod = counts[:, MODIFIER_KINDS.start : MODIFIER_KINDS.stop] @ _MODIFIER_VALUES
+    double = np.where(counts[:, X2_INDEX] > 0, multiplier, 1)
+    spare = counts[:, SC_INDEX] - np.maximum(numbers - 1, 0).sum(axis=1)  # Second Chances left after repeats
+    return held, num_sum, unique, mod, double, spare < 0, spare > 0
+
+
+def check_bust_batch(drawn, seen, rules=None):
+    """Vectorized check_bust over many states at once.
+
+    `drawn` and `seen` are (n, len(CARD_KINDS)) count arrays (see cards_to_counts);
+    `seen` is taken out of the master deck of `rules` (DEFAULT_RULES if omitted).
+    Returns arrays of current score, expected value, bust chance, event chance and
+    recommendation, matching check_bust row for row. Bust chance can differ in the
+    last bit since check_bust sums it in the order the cards were typed.
+    """
+    compiled = compile_rules(rules)
+    bonus, multiplier = compiled.scoring
+
+    drawn = np.asarray(drawn, dtype=np.int64)
+    seen = np.asarray(seen, dtype=np.int64)
+    deck = np.maximum(compiled.master_counts - drawn - seen, 0)
+    cards_left = deck.sum(axis=1)
+    # An empty deck has nothing to draw: every chance and the EV are 0, as in check_bust
+    draw_from = np.maximum(cards_left, 1)
+
+    held, num_sum, unique, mod, double, busted, has_sc = _batch_score_parts(drawn, multiplier)
+    alive = ~busted
+    curr_score = np.where(alive, num_sum * double + mod + (unique == 7) * bonus, 0)
+
+    # Accumulate column by column in deck order so sums round like check_bust
+    total_expected_value = np.zeros(len(drawn))
+    bust_total = np.zeros(len(drawn))
+    for idx in range(len(CARD_KINDS)):
+        perc = deck[:, idx] / draw_from
+        if idx in NUMBER_KINDS:
+            temp_total = (num_sum + idx) * double + mod + (unique == 6) * bonus
+            temp_total = np.where(alive & ~held[:, idx], temp_total, 0)
+            temp_total = np.where(alive & held[:, idx] & has_sc, curr_score, temp_total)
+        elif idx in MODIFIER_KINDS:
+            temp_total = num_sum * double + mod + int(CARD_KINDS[idx]) + (unique == 7) * bonus
+            temp_total = np.where(alive, temp_total, 0)
+        elif idx == X2_INDEX:
+            temp_total = np.where(alive, num_sum * multiplier + mod + (unique == 7) * bonus, 0)
+        else:
+            temp_total = curr_score
+        total_expected_value += perc * (temp_total - curr_score)
+        if idx not in _EVENT_INDICES:
+            bust_total += ((drawn[:, idx] > 0) & ~has_sc) * perc
+    event_total = sum(deck[:, idx] / draw_from for idx in _EVENT_INDICES)
+
+    return {
+        "current_score": curr_score,
+        "recommendation": np.where(total_expected_value > 0, "HIT", "STAY"),
+        "expected_value": total_expected_value,
+        "bust_chance": bust_total,
+        "event_chance": event_total,
     }
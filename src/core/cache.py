@@ -0,0 +1,229 @@
+# ---------------------
+# Imports
+# ---------------------
+import threading
+
+import streamlit as st
+from streamlit.runtime import Runtime
+from src.core import jobs, scoring, storage, tables, tokenizer
+from src.core.rules import DEFAULT_RULES
+
+# ---------------------
+# Cache Settings
+# ---------------------
+ADVICE_CACHE_SIZE = 256
+TABLE_CACHE_SIZE = 64
+
+# st.cache_* don't expose counters, so calls and misses (body runs) are counted here
+_stats_lock = threading.Lock()
+_calls = {}
+_misses = {}
+
+
+def _count(counter, name):
+    with _stats_lock:
+        counter[name] = counter.get(name, 0) + 1
+
+
+def cache_stats():
+    """Hit/miss counts per cache, aggregated over every session in this process."""
+    with _stats_lock:
+        stats = {
+            name: {"hits": calls - _misses.get(name, 0), "misses": _misses.get(name, 0)}
+            for name, calls in _calls.items()
+        }
+    # Score parsing has its own LRU in the tokenizer (cheaper than st.cache_data for a call this small)
+    info = tokenizer.parse_score.cache_info()
+    stats["parse"] = {"hits": info.hits, "misses": info.misses}
+    table = get_policy_table()
+    if table is not None:
+        stats["policy_table"] = {"hits": table.lookups - table.misses, "misses": table.misses}
+    return stats
+
+
+# ---------------------
+# Advisor Caches
+# ---------------------
+# Keyed on the sorted drawn multiset and the deck counts, so reordering the
+# typed cards or rerunning an unchanged page hits the cache
+@st.cache_data(max_entries=ADVICE_CACHE_SIZE, show_spinner=False)
+def _advice(drawn_key, deck_key):
+    from src.core import advisor_logic  # Advisor-only; keep it off the Scorer's cold start
+
+    _count(_misses, "advice")
+    return advisor_logic.check_bust(list(drawn_key), advisor_logic.DeckState(deck_key))
+
+
+def get_advice(drawn, deck):
+    _count(_calls, "advice")
+    return _advice(tuple(sorted(drawn)), deck.key())
+
+
+@st.cache_data(max_entries=ADVICE_CACHE_SIZE, show_spinner=False)
+def _lookahead(drawn_key, deck_key):
+    from src.core import advisor_logic  # Advisor-only; keep it off the Scorer's cold start
+
+    _count(_misses, "lookahead")
+    return advisor_logic.solve_optimal_stopping(list(drawn_key), advisor_logic.DeckState(deck_key))
+
+
+def get_table_lookahead(drawn, deck):
+    """Lookahead from the precomputed policy table, or None if there's no table or it doesn't cover this state."""
+    table = get_policy_table()
+    return table.lookup(drawn, deck) if table is not None else None
+
+
+def get_lookahead(drawn, deck):
+    _count(_calls, "lookahead")
+    result = get_table_lookahead(drawn, deck)
+    if result is not None:
+        return result
+    return _lookahead(tuple(sorted(drawn)), deck.key())
+
+
+@st.cache_data(max_entries=ADVICE_CACHE_SIZE, show_spinner=False)
+def _score_distribution(drawn_key, deck_key, stay_rule):
+    from src.core import advisor_logic  # Advisor-only; keep it off the Scorer's cold start
+
+    _count(_misses, "distribution")
+    return advisor_logic.final_score_distribution(list(drawn_key), advisor_logic.DeckState(deck_key), stay_rule)
+
+
+def get_score_distribution(drawn, deck, stay_rule):
+    _count(_calls, "distribution")
+    return _score_distribution(tuple(sorted(drawn)), deck.key(), stay_rule)
+
+
+# One entry per (hands, deck, totals): every candidate is ranked in the same
+# call, so picking a different target on the page only reads this result
+@st.cache_data(max_entries=ADVICE_CACHE_SIZE, show_spinner=False)
+def _targeting(hands_key, deck_key, totals_key, me):
+    from src.core import advisor_logic, targeting  # Advisor-only; keep them off the Scorer's cold start
+
+    _count(_misses, "targeting")
+    hands = {name: list(cards) for name, cards in hands_key}
+    return targeting.rank_targets(hands, advisor_logic.DeckState(deck_key), dict(totals_key), me)
+
+
+def get_targeting(hands, deck, totals=None, me="You"):
+    """Freeze / Flip 3 ranking of every hand in `hands` ({name: cards}); `totals` maps names to Scorer totals."""
+    _count(_calls, "targeting")
+    hands_key = tuple((name, tuple(sorted(cards))) for name, cards in hands.items())
+    totals_key = tuple(sorted((totals or {}).items()))
+    return _targeting(hands_key, deck.key(), totals_key, me)
+
+
+@st.cache_data(max_entries=ADVICE_CACHE_SIZE, show_spinner=False)
+def _win_probability(totals_key, player, drawn_key, deck_key, opponents_key):
+    from src.core import advisor_logic, win_probability  # Advisor-only; keep them off the Scorer's cold start
+
+    _count(_misses, "win_probability")
+    deck = advisor_logic.DeckState(deck_key)
+    # Opponents with known cards play out their hand optimally; the rest start a fresh round
+    round_pmfs = [None] * len(totals_key)
+    for idx, cards in opponents_key:
+        round_pmfs[idx] = advisor_logic.final_score_distribution(list(cards), deck)["pmf"]
+    return win_probability.hit_or_stay(player, list(totals_key), list(drawn_key), deck, round_pmfs)
+
+
+def get_win_probability(totals, player, drawn, deck, opponent_hands):
+    """HIT vs STAY win chances for `player`; `opponent_hands` maps player index -> current cards."""
+    _count(_calls, "win_probability")
+    opponents_key = tuple(sorted((idx, tuple(sorted(cards))) for idx, cards in opponent_hands.items()))
+    return _win_probability(tuple(totals), player, tuple(sorted(drawn)), deck.key(), opponents_key)
+
+
+# ---------------------
+# Scorer Caches
+# ---------------------
+def build_history_frame(players, history, totals):
+    """Totals table for the Scorer (rows=players, cols=Total, Left, R1..Rn)."""
+    import pandas as pd  # only the Scorer needs pandas; keep it off the Advisor's cold start
+
+    # Build history frame: rows=players, cols=R1..Rn; fill missing with 0
+    rounds = len(history)
+    if rounds > 0:
+        hist = pd.DataFrame(history.as_array(len(players))).T
+        hist.columns = [f"R{r+1}" for r in range(rounds)]
+        hist.insert(0, "Player", list(players))
+        hist_df = hist.set_index("Player")
+        hist_df = hist_df.fillna(0)
+    else:
+        hist_df = pd.DataFrame({"Player": list(players)}).set_index("Player")
+
+    # Add Total column
+    hist_df["Total"] = totals
+
+    # Add Left column (amount needed to reach the target score)
+    hist_df["Left"] = [max(0, DEFAULT_RULES.target_score - t) for t in totals]
+
+    # Order columns: Total, Left, then rounds
+    round_cols = [c for c in hist_df.columns if c.startswith("R")]
+    cols_order = ["Total", "Left"] + round_cols if round_cols else ["Total", "Left"]
+    return hist_df[cols_order]
+
+
+def style_history_table(hist_df):
+    # Styling: white -> dark green on Total
+    return hist_df.style.background_gradient(cmap="Greens", subset=["Total"]).format("{:.0f}")
+
+
+def build_history_table(players, history, totals):
+    """Styled Totals table for the Scorer (see build_history_frame)."""
+    return style_history_table(build_history_frame(players, history, totals))
+
+
+# Only the frame is cached: st.write mutates a Styler while rendering it, so each
+# render (possibly several viewers of one table at once) styles its own copy.
+# history (a ScoreHistory) and totals are underscored (not hashed); (game_id, log_seq, version)
+# identifies them. The version restarts when a saved game is resumed, the log seq never repeats.
+@st.cache_data(max_entries=TABLE_CACHE_SIZE, show_spinner=False)
+def _history_frame(game_id, log_seq, history_version, players, _history, _totals):
+    _count(_misses, "table")
+    return build_history_frame(players, _history, _totals)
+
+
+def get_history_table(session_state, totals):
+    """Styled Totals table for this game, built fresh from the cached frame."""
+    _count(_calls, "table")
+    frame = _history_frame(
+        session_state["game_id"],
+        session_state.get("log_seq", 0),
+        session_state["history_version"],
+        tuple(session_state["players"]),
+        scoring.get_history(session_state),
+        totals,
+    )
+    return style_history_table(frame)
+
+
+# One writer thread and queue per process, shared by every session
+@st.cache_resource(show_spinner=False)
+def get_game_store():
+    return storage.GameStore(storage.DATA_DIR, is_live=_session_connected)
+
+
+def _session_connected(session_id):
+    # A closed or refreshed tab's session is disconnected, so its game can be picked up again
+    return not Runtime.exists() or Runtime.instance().is_active_session(session_id)
+
+
+# Every table at an event, shared by all sessions so anyone can score any table
+@st.cache_resource(show_spinner=False)
+def get_table_registry():
+    return tables.TableRegistry(get_game_store())
+
+
+# Built offline (python -m src.core.policy_table) and mapped once per process;
+# None when no table has been built, so lookups fall back to the live solver
+@st.cache_resource(show_spinner=False)
+def get_policy_table():
+    from src.core import policy_table  # Advisor-only; keep it off the Scorer's cold start
+
+    return policy_table.open_table(policy_table.POLICY_PATH)
+
+
+# Slow Advisor analyses run here so the page can render while they finish
+@st.cache_resource(show_spinner=False)
+def get_job_executor():
+    return jobs.JobExecutor()
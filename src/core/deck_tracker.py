@@ -0,0 +1,73 @@
+# ---------------------
+# Imports
+# ---------------------
+from src.core.advisor_logic import CARD_KINDS, DeckState, build_master_deck_state
+
+# ---------------------
+# Deck Tracker
+# ---------------------
+class DeckTracker:
+    """Running view of the draw pile across rounds, updated one card at a time.
+
+    `deck` is what is left to draw, `discarded` holds earlier rounds' cards and
+    `round_cards` what has been entered this round. The game only reshuffles the
+    discard pile when the draw pile runs out, so entering a card that can only
+    have come from the discards triggers that reshuffle automatically.
+    """
+
+    __slots__ = ("deck", "discarded", "round_cards", "_taken", "reshuffles")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.deck = build_master_deck_state()
+        self.discarded = DeckState()
+        self.round_cards = DeckState()
+        self._taken = DeckState()  # round cards actually removed from `deck`
+        self.reshuffles = 0
+
+    def add(self, card):
+        card = str(card)
+        self.round_cards.undraw(card)
+        if not self.deck.count(card) and (self.deck.total == 0 or self.discarded.count(card)):
+            self.reshuffle()
+        if self.deck.draw(card):
+            self._taken.undraw(card)
+
+    def remove(self, card):
+        card = str(card)
+        if not self.round_cards.draw(card):
+            return
+        # Only put back what add() really took out of the deck
+        if self._taken.count(card) > self.round_cards.count(card):
+            self._taken.draw(card)
+            self.deck.undraw(card)
+
+    def sync(self, cards):
+        """Make this round's entered cards equal `cards`, touching only the difference."""
+        target = DeckState.from_cards(cards)
+        current = self.round_cards
+        for idx in range(len(target.counts)):
+            diff = target.counts[idx] - current.counts[idx]
+            if diff:
+                card = CARD_KINDS[idx]
+                for _ in range(abs(diff)):
+                    if diff > 0:
+                        self.add(card)
+                    else:
+                        self.remove(card)
+
+    def end_round(self):
+        for idx, count in enumerate(self._taken.counts):
+            self.discarded.counts[idx] += count
+        self.discarded.total += self._taken.total
+        self.round_cards = DeckState()
+        self._taken = DeckState()
+
+    def reshuffle(self):
+        for idx, count in enumerate(self.discarded.counts):
+            self.deck.counts[idx] += count
+        self.deck.total += self.discarded.total
+        self.discarded = DeckState()
+        self.reshuffles += 1
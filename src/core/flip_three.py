@@ -0,0 +1,252 @@
+# ---------------------
+# Imports
+# ---------------------
+from collections import OrderedDict
+
+import numpy as np
+
+from src.core.advisor_logic import (
+    DeckState,
+    CARD_KINDS,
+    NUMBER_KINDS,
+    _BUST_BIT,
+    _MODIFIER_BIT,
+    _NUMBER_BIT,
+    _cached,
+    calc_score,
+    compile_rules,
+    hand_key,
+    holds_second_chance,
+)
+
+# ---------------------
+# Flip 3 Engine
+# ---------------------
+# Three forced draws, resolved exactly over deck counts. Within the sequence:
+#   - a duplicate number busts the target unless they hold Second Chance, which
+#     is discarded along with the duplicate
+#   - drawing `sc` gives the target Second Chance (a second one is passed on)
+#   - drawing `f3` or `fr` sets it aside; the target plays it on someone else once
+#     the three draws are done (if they haven't busted), so it uses up a draw
+#     without changing their score
+# Draw order does not affect the remaining deck, so memoizing on (hand, deck
+# counts) collapses the ordered triples to multisets.
+FLIP_THREE_DRAWS = 3
+FLIP_THREE_CACHE_SIZE = 256
+
+_KIND_BITS = [
+    _NUMBER_BIT.get(card) or _MODIFIER_BIT.get(card) or 0 for card in CARD_KINDS
+]
+_NUMBER_MASK = sum(1 << num for num in NUMBER_KINDS)
+_ACTION_INDICES = (CARD_KINDS.index("f3"), CARD_KINDS.index("fr"))
+_SC_INDEX = CARD_KINDS.index("sc")
+
+SEQUENCE_CACHE_SIZE = 8  # draw-sequence tables, one per deck state
+
+_flip_three_cache = OrderedDict()
+_sequence_cache = OrderedDict()
+
+
+def _outcomes(key, has_sc, pending, left, deck, memo, table):
+    # Distribution over (outcome, score, pending) where outcome is "bust", "flip7"
+    # or "ok" and pending marks a set-aside f3/fr still to be played
+    if left == 0 or deck.total == 0:
+        return {("ok", table[key], pending): 1.0}
+
+    memo_key = (key, has_sc, pending, left, deck.key())
+    cached = memo.get(memo_key)
+    if cached is not None:
+        return cached
+
+    dist = {}
+    counts = deck.counts
+    total = deck.total
+    for idx, count in enumerate(counts):
+        if not count:
+            continue
+        p = count / total
+        bit = _KIND_BITS[idx]
+
+        counts[idx] -= 1
+        deck.total -= 1
+        if idx in NUMBER_KINDS and key & bit:
+            if has_sc:
+                sub = _outcomes(key, False, pending, left - 1, deck, memo, table)
+            else:
+                sub = {("bust", 0, False): 1.0}
+        elif bit:
+            next_key = key | bit
+            if bin(next_key & _NUMBER_MASK).count("1") == 7:
+                # Flip 7 ends the round, so anything set aside is never played
+                sub = {("flip7", table[next_key], False): 1.0}
+            else:
+                sub = _outcomes(next_key, has_sc, pending, left - 1, deck, memo, table)
+        elif idx == _SC_INDEX:
+            sub = _outcomes(key, True, pending, left - 1, deck, memo, table)
+        elif idx in _ACTION_INDICES:
+            sub = _outcomes(key, has_sc, True, left - 1, deck, memo, table)
+        else:
+            sub = _outcomes(key, has_sc, pending, left - 1, deck, memo, table)
+        counts[idx] += 1
+        deck.total += 1
+
+        for outcome, q in sub.items():
+            dist[outcome] = dist.get(outcome, 0.0) + p * q
+
+    memo[memo_key] = dist
+    return dist
+
+
+def flip_three_outcomes(hand, deck, rules=None):
+    """Exact outcome distribution of forcing `hand` to take three draws from `deck`.
+
+    Returns bust and Flip 7 probabilities, the chance the target ends up holding a
+    set-aside f3/fr to play, the expected score afterwards and the full score
+    distribution (score -> probability, bust counted as 0). Scores follow `rules`
+    (DEFAULT_RULES if omitted).
+    """
+    if not isinstance(hand, DeckState):
+        hand = [str(item) for item in hand]
+    if not isinstance(deck, DeckState):
+        deck = DeckState.from_cards(deck)
+
+    key = hand_key(hand)
+    if key is None or key & _BUST_BIT:
+        return {
+            "current_score": calc_score(hand, rules),
+            "bust_chance": 1.0,
+            "flip_seven_chance": 0.0,
+            "chained_action_chance": 0.0,
+            "expected_score": 0.0,
+            "score_distribution": {0: 1.0},
+        }
+    has_sc = holds_second_chance(hand)
+    compiled = compile_rules(rules)
+
+    return _cached(
+        (key, has_sc, compiled.scoring, deck.key()),
+        lambda: _summarize(key, has_sc, deck.copy(), compiled.score_table),
+        _flip_three_cache,
+        FLIP_THREE_CACHE_SIZE,
+    )
+
+
+def _summarize(key, has_sc, deck, table):
+    dist = _outcomes(key, has_sc, False, FLIP_THREE_DRAWS, deck, {}, table)
+
+    bust = 0.0
+    flip_seven = 0.0
+    chained = 0.0
+    scores = {}
+    for (outcome, score, pending), p in dist.items():
+        if outcome == "bust":
+            bust += p
+        elif outcome == "flip7":
+            flip_seven += p
+        if pending:
+            chained += p
+        scores[score] = scores.get(score, 0.0) + p
+
+    return {
+        "current_score": table[key],
+        "bust_chance": bust,
+        "flip_seven_chance": flip_seven,
+        "chained_action_chance": chained,
+        "expected_score": sum(score * p for score, p in scores.items()),
+        "score_distribution": dict(sorted(scores.items())),
+    }
+
+
+# ---------------------
+# Batched Flip 3
+# ---------------------
+# Same rules as _outcomes, but for many hands against one deck at once: every
+# ordered triple of card kinds the deck can deal is enumerated once (at most
+# 22^3, weighted by drawing without replacement), then all hands are stepped
+# through all triples together with NumPy. Draws after a bust or Flip 7 don't
+# change the outcome, so full-length triples carry the right probabilities.
+_KIND_BITS_ARRAY = np.array(_KIND_BITS, dtype=np.int64)
+_POPCOUNT = np.array([bin(mask).count("1") for mask in range(1 << len(NUMBER_KINDS))], dtype=np.int8)
+
+
+def _draw_sequences(deck):
+    # (kinds (S, 3), weights (S,)) for the ordered triples `deck` can deal
+    counts = tuple(deck.counts)
+    return _cached(deck.key(), lambda: _build_sequences(counts), _sequence_cache, SEQUENCE_CACHE_SIZE)
+
+
+def _build_sequences(counts):
+    counts = np.array(counts, dtype=np.float64)
+    kinds = np.flatnonzero(counts)
+    total = counts.sum()
+    a, b, c = (grid.ravel() for grid in np.meshgrid(kinds, kinds, kinds, indexing="ij"))
+    weights = (
+        counts[a] / total
+        * (counts[b] - (b == a)) / (total - 1)
+        * (counts[c] - (c == a) - (c == b)) / (total - 2)
+    )
+    live = weights > 0
+    return np.stack([a[live], b[live], c[live]], axis=1), weights[live]
+
+
+def flip_three_batch(hands, deck, rules=None):
+    """flip_three_outcomes for every hand in `hands` (card lists) against the same `deck`, in one pass.
+
+    Returns arrays (one entry per hand) of current score, bust chance, Flip 7
+    chance, chained-action chance and expected score afterwards.
+    """
+    if not isinstance(deck, DeckState):
+        deck = DeckState.from_cards(deck)
+    hands = [[str(item) for item in hand] for hand in hands]
+    n = len(hands)
+    table = np.frombuffer(compile_rules(rules).score_table, dtype=np.uint16)
+
+    keys = [hand_key(hand) for hand in hands]
+    dead = np.array([key is None or bool(key & _BUST_BIT) for key in keys])
+    start = np.array([0 if d else key for key, d in zip(keys, dead)], dtype=np.int64)
+    current = np.where(dead, [calc_score(hand, rules) if d else 0 for hand, d in zip(hands, dead)], table[start])
+
+    if deck.total < FLIP_THREE_DRAWS:
+        # Too few cards to enumerate triples; the exact recursion handles short decks
+        results = [flip_three_outcomes(hand, deck, rules) for hand in hands]
+        return {name: np.array([r[name] for r in results]) for name in (
+            "current_score", "bust_chance", "flip_seven_chance", "chained_action_chance", "expected_score",
+        )}
+
+    sequences, weights = _draw_sequences(deck)
+    shape = (n, len(weights))
+    key = np.broadcast_to(start[:, None], shape).copy()
+    has_sc = np.broadcast_to(np.array([holds_second_chance(hand) for hand in hands])[:, None], shape).copy()
+    alive = np.broadcast_to(~dead[:, None], shape).copy()
+    bust = np.broadcast_to(dead[:, None], shape).copy()
+    flip_seven = np.zeros(shape, dtype=bool)
+    pending = np.zeros(shape, dtype=bool)
+
+    for step in range(FLIP_THREE_DRAWS):
+        kind = sequences[:, step]
+        bit = _KIND_BITS_ARRAY[kind]
+        is_number = kind < len(NUMBER_KINDS)
+
+        duplicate = alive & is_number & ((key & bit) != 0)
+        busted = duplicate & ~has_sc
+        has_sc &= ~(duplicate & has_sc)  # Second Chance absorbs the duplicate and is discarded
+        bust |= busted
+        alive &= ~busted
+
+        adds = alive & (bit != 0) & ~duplicate
+        key = np.where(adds, key | bit, key)
+        sevens = adds & (_POPCOUNT[key & _NUMBER_MASK] == 7)
+        flip_seven |= sevens
+        alive &= ~sevens
+
+        has_sc |= alive & (kind == _SC_INDEX)
+        pending |= alive & np.isin(kind, _ACTION_INDICES)
+
+    score = np.where(bust, 0, table[key])
+    return {
+        "current_score": current,
+        "bust_chance": bust @ weights,
+        "flip_seven_chance": flip_seven @ weights,
+        "chained_action_chance": (pending & ~bust & ~flip_seven) @ weights,
+        "expected_score": score @ weights,
+    }
@@ -0,0 +1,60 @@
+# ---------------------
+# Imports
+# ---------------------
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------
+# Settings
+# ---------------------
+JOB_WORKERS = 2  # the solvers spend most of their time in NumPy, which releases the GIL
+
+
+# ---------------------
+# Executor
+# ---------------------
+class JobExecutor:
+    """Thread pool for slow analyses, shared by every session in the process.
+
+    Jobs are keyed: submitting a key that is already queued or running returns
+    the same Future and just records another owner, so identical requests from
+    different sessions compute once. When every owner has released a job that
+    hasn't started yet, it is cancelled; a job already running is left to finish
+    (its result still fills the caches behind it).
+    """
+
+    def __init__(self, workers=JOB_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flip7-job")
+        self._lock = threading.RLock()  # Future.cancel() runs _forget's done-callback while release() holds it
+        self._jobs = {}  # key -> (future, owners)
+
+    def submit(self, key, owner, fn, *args):
+        with self._lock:
+            entry = self._jobs.get(key)
+            if entry is not None:
+                entry[1].add(owner)
+                return entry[0]
+            future = self._pool.submit(fn, *args)
+            self._jobs[key] = (future, {owner})
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def release(self, key, owner):
+        with self._lock:
+            entry = self._jobs.get(key)
+            if entry is None:
+                return
+            future, owners = entry
+            owners.discard(owner)
+            if not owners:
+                future.cancel()  # the done-callback drops the entry if this worked
+
+    def _forget(self, key, future):
+        with self._lock:
+            entry = self._jobs.get(key)
+            if entry is not None and entry[0] is future:
+                del self._jobs[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._jobs)
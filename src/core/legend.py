@@ -2,26 +2,7 @@
 # Imports
 # ---------------------
 import streamlit as st
-
-# ---------------------
-# Card Aliases (for easier typing on iPhone)
-# ---------------------
-CARD_ALIASES = {
-    "-2": "+2",
-    "-4": "+4",
-    "-6": "+6",
-    "-8": "+8",
-    "-10": "+10",
-    "!": "x2",
-    "$": "sc",
-    "&": "fr",
-    "@": "f3",
-}
-
-
-def normalize_card(card):
-    return CARD_ALIASES.get(card, card)
-
+from src.core.tokenizer import CARD_ALIASES, normalize_card  # noqa: F401 (kept importable from here)
 
 # ---------------------
 # Legend Render Functions
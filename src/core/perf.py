@@ -0,0 +1,162 @@
+# ---------------------
+# Imports
+# ---------------------
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# ---------------------
+# State
+# ---------------------
+# Off unless FLIP7_PERF=1 or the Perf page turns it on; when off, instrumented
+# functions pay one global lookup and nothing else
+ENABLED = os.environ.get("FLIP7_PERF") == "1"
+HISTOGRAM_BUCKETS = 32  # bucket b holds latencies in [2^(b-1), 2^b) microseconds
+SESSION_LIMIT = 32  # per-session stats kept for the most recently active sessions only
+
+_lock = threading.Lock()
+_aggregate = {}
+_sessions = OrderedDict()  # session id -> {name: LatencyStats}, least recently recorded first
+
+
+class LatencyStats:
+    """Call count, total/max latency and a log2 histogram for one instrumented name."""
+
+    __slots__ = ("calls", "total_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def record(self, ns):
+        self.calls += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[min((ns // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        # Upper edge (us) of the bucket holding the q-th call
+        target = q * self.calls
+        seen = 0
+        for b, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return float(1 << b)
+        return 0.0
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "mean_us": self.total_ns / self.calls / 1000 if self.calls else 0.0,
+            "p50_us": self.percentile(0.5),
+            "p95_us": self.percentile(0.95),
+            "max_us": self.max_ns / 1000,
+            "histogram_us": {f"<{1 << b}": count for b, count in enumerate(self.buckets) if count},
+        }
+
+
+# ---------------------
+# Recording
+# ---------------------
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def reset():
+    with _lock:
+        _aggregate.clear()
+        _sessions.clear()
+
+
+def _session_id():
+    # Streamlit session if we're inside a rerun, else a single "local" bucket
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return "local"
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else "local"
+
+
+def record(name, ns):
+    session = _session_id()
+    with _lock:
+        stats = _aggregate.get(name)
+        if stats is None:
+            stats = _aggregate[name] = LatencyStats()
+        stats.record(ns)
+        per_session = _sessions.get(session)
+        if per_session is None:
+            per_session = _sessions[session] = {}
+            if len(_sessions) > SESSION_LIMIT:
+                _sessions.popitem(last=False)  # the aggregate still counts its calls
+        else:
+            _sessions.move_to_end(session)
+        stats = per_session.get(name)
+        if stats is None:
+            stats = per_session[name] = LatencyStats()
+        stats.record(ns)
+
+
+def instrument(name):
+    """Decorator: time every call under `name` while instrumentation is enabled."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timed(name):
+    """Context manager version of instrument() for blocks inside a function."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter_ns() - start)
+
+
+# ---------------------
+# Reporting
+# ---------------------
+def snapshot(session_id=None):
+    """{name: stats dict} for one session, or aggregated over all sessions."""
+    with _lock:
+        source = _aggregate if session_id is None else _sessions.get(session_id, {})
+        return {name: stats.to_dict() for name, stats in sorted(source.items())}
+
+
+def export_json():
+    with _lock:
+        sessions = list(_sessions)
+    return json.dumps(
+        {
+            "enabled": ENABLED,
+            "aggregate": snapshot(),
+            "sessions": {session: snapshot(session) for session in sessions},
+        },
+        indent=2,
+    )
+
+
+def current_session_id():
+    return _session_id()
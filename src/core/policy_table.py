@@ -0,0 +1,309 @@
+# ---------------------
+# Imports
+# ---------------------
+import argparse
+import itertools
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.core.advisor_logic import (
+    BUST_SHIFT,
+    CARD_KINDS,
+    GAIN,
+    HELD,
+    SC_INDEX,
+    SPENT,
+    _BUST_BIT,
+    _NUMBER_BIT,
+    _SOLVER_KINDS,
+    _StateSpace,
+    build_master_deck_state,
+    hand_key,
+    holds_second_chance,
+    score_table,
+)
+
+# ---------------------
+# Settings
+# ---------------------
+POLICY_PATH = os.environ.get("FLIP7_POLICY_TABLE", os.path.join("data", "policy.bin"))
+HAND_CARDS = 4  # hands of up to this many number/modifier cards are stored
+SEEN_CARDS = 2  # ... with up to this many number/modifier/`sc` cards gone from the deck besides the hand
+TABLE_VERSION = 2  # bump when the solver's answers change, so stale tables are ignored
+CHECKPOINT_SOLVES = 32  # the builder rewrites the table after this many new solves
+
+# ---------------------
+# Layout
+# ---------------------
+# The lookahead solver only looks at number/modifier cards and Second Chance
+# (f3/fr are redrawn), so its answer depends on the hand's key, its Second
+# Chance phase and which of those cards have left the deck. One solve from an
+# empty hand covers every hand and phase reachable under the same removed cards,
+# so the builder solves once per removed multiset.
+#
+# File: 32-byte header, then `count` sorted uint64 keys, then float32 values
+# (playing optimally) and float32 hit values, in key order. A key is the
+# removed multiset's code and the phase (2 bits) shifted above the hand key.
+_MAGIC = b"F7POLICY"
+_HEADER = struct.Struct("<8sIIIxxxxQ")
+_SC_POSITION = len(_SOLVER_KINDS)  # `sc` follows the solver kinds in removed multisets
+_KINDS = list(_SOLVER_KINDS) + [SC_INDEX]
+_BASE = len(_KINDS) + 1
+_MASTER = build_master_deck_state().counts
+_CARD_BIT = {CARD_KINDS[idx]: b for b, idx in enumerate(_SOLVER_KINDS)}
+_NUMBER_KINDS = {idx for idx in _SOLVER_KINDS if CARD_KINDS[idx] in _NUMBER_BIT}
+
+
+def _seen_code(removed):
+    # `removed` is a sorted sequence of _KINDS positions; 0 is the empty multiset
+    return sum((b + 1) * _BASE ** i for i, b in enumerate(removed))
+
+
+def _prefix(removed, phase):
+    return ((_seen_code(removed) << 2) | phase) << BUST_SHIFT
+
+
+def seen_multisets(seen_cards=SEEN_CARDS):
+    """Every multiset of up to `seen_cards` number/modifier/`sc` cards the master deck can lose."""
+    for size in range(seen_cards + 1):
+        for removed in itertools.combinations_with_replacement(range(len(_KINDS)), size):
+            if all(removed.count(b) <= _MASTER[_KINDS[b]] for b in set(removed)):
+                yield removed
+
+
+# ---------------------
+# Reader
+# ---------------------
+class PolicyTable:
+    """Read-only view of a built table; the arrays point straight into the mmap."""
+
+    __slots__ = ("path", "hand_cards", "seen_cards", "keys", "values", "hits", "_map", "lookups", "misses")
+
+    def __init__(self, path, hand_cards, seen_cards, keys, values, hits, mapped=None):
+        self.path = path
+        self.hand_cards = hand_cards
+        self.seen_cards = seen_cards
+        self.keys = keys
+        self.values = values
+        self.hits = hits
+        self._map = mapped
+        self.lookups = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _find(self, keys):
+        # Positions of `keys`, or None if any is missing
+        pos = np.searchsorted(self.keys, keys)
+        if (pos >= len(self.keys)).any() or (self.keys[np.minimum(pos, len(self.keys) - 1)] != keys).any():
+            return None
+        return pos
+
+    def lookup(self, drawn, deck):
+        """solve_optimal_stopping(drawn, deck) from the table, or None if the state isn't covered."""
+        self.lookups += 1
+        result = self._lookup([str(item) for item in drawn], deck)
+        if result is None:
+            self.misses += 1
+        return result
+
+    def _lookup(self, drawn, deck):
+        key = hand_key(drawn)
+        if key is None or key & _BUST_BIT:
+            return None
+        has_sc = holds_second_chance(drawn)
+        phase = HELD if has_sc else GAIN if deck.counts[SC_INDEX] else SPENT
+
+        # Cards gone from the deck besides the hand; the next card must stay in the table too
+        removed = []
+        children = []
+        repeats = False  # a held number can still come (absorbed when HELD, a bust otherwise)
+        held_count = 0
+        for b, idx in enumerate(_KINDS):
+            held = has_sc if b == _SC_POSITION else key >> b & 1
+            held_count += held and b != _SC_POSITION
+            gone = _MASTER[idx] - deck.counts[idx] - held
+            if gone < 0:
+                return None
+            removed += [b] * gone
+            if b < _SC_POSITION and deck.counts[idx]:
+                if not held:
+                    children.append(b)
+                elif idx in _NUMBER_KINDS:
+                    repeats = True
+        if held_count >= self.hand_cards or len(removed) > self.seen_cards:
+            return None
+
+        # Root, then each new card, then the same hand in the phase a repeat or `sc` leads to
+        states = [(key, phase)] + [(key | 1 << b, phase) for b in children]
+        if phase == HELD and repeats:
+            states.append((key, SPENT))
+        if phase == GAIN:
+            states.append((key, HELD))
+        pos = self._find(np.array([_prefix(removed, p) | k for k, p in states], dtype=np.uint64))
+        if pos is None:
+            return None
+
+        # One gather per column, then plain floats from here on
+        values = self.values[pos].tolist()
+        hits = self.hits[pos].tolist()
+        table = score_table()  # built on first lookup, not at import
+        stays = [table[k] for k, _ in states]
+        outcome = {
+            state: (v, "HIT" if h > s else "STAY") for state, v, h, s in zip(states, values, hits, stays)
+        }
+        value, hit, stay = values[0], hits[0], float(stays[0])
+
+        next_card_policy = []
+        cards_left = len(deck)
+        for card, count in deck.items():
+            if card == "sc":
+                state = (key, HELD)
+            elif card in _CARD_BIT:
+                bit = 1 << _CARD_BIT[card]
+                state = (key | bit, phase) if not key & bit else (key, SPENT) if phase == HELD else None
+            else:
+                state = (key, phase)
+            entry = outcome.get(state)
+            if entry is None:
+                next_card_policy.append((card, count / cards_left, 0.0, "BUST"))
+            else:
+                next_card_policy.append((card, count / cards_left, entry[0], entry[1]))
+        next_card_policy = sorted(next_card_policy, key=lambda x: x[2], reverse=True)
+
+        return {
+            "recommendation": "HIT" if hit > stay else "STAY",
+            "value": value,
+            "stay_value": stay,
+            "hit_value": hit,
+            "next_card_policy": next_card_policy,
+        }
+
+
+def open_table(path=POLICY_PATH):
+    """Map a built table read-only, or None if there isn't one (or it was built by another solver version)."""
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):  # ValueError: empty file
+        return None
+    if len(mapped) < _HEADER.size:
+        return None
+    magic, version, hand_cards, seen_cards, count = _HEADER.unpack_from(mapped)
+    if magic != _MAGIC or version != TABLE_VERSION or len(mapped) != _HEADER.size + count * 16:
+        return None
+    offset = _HEADER.size
+    keys = np.frombuffer(mapped, dtype="<u8", count=count, offset=offset)
+    values = np.frombuffer(mapped, dtype="<f4", count=count, offset=offset + 8 * count)
+    hits = np.frombuffer(mapped, dtype="<f4", count=count, offset=offset + 12 * count)
+    return PolicyTable(path, hand_cards, seen_cards, keys, values, hits, mapped)
+
+
+# ---------------------
+# Builder
+# ---------------------
+def solve_seen(removed, hand_cards=HAND_CARDS):
+    """Solve from an empty hand with `removed` gone; (keys, values, hits) for hands up to `hand_cards`."""
+    deck_counts = list(_MASTER)
+    for b in removed:
+        deck_counts[_KINDS[b]] -= 1
+    space = _StateSpace(0, deck_counts)
+    values, hits = space.solve()
+
+    subsets = np.concatenate(space.layers[: hand_cards + 1])
+    hand_keys = np.zeros(len(subsets), dtype=np.uint64)
+    for i, b in enumerate(space.free):
+        hand_keys |= ((subsets >> i) & 1).astype(np.uint64) << np.uint64(b)
+    phases = space.phases()
+    keys = np.concatenate([hand_keys | np.uint64(_prefix(removed, phase)) for phase in phases])
+    return (
+        keys,
+        np.concatenate([values[phase][subsets] for phase in phases]).astype(np.float32),
+        np.concatenate([hits[phase][subsets] for phase in phases]).astype(np.float32),
+    )
+
+
+def write_table(path, hand_cards, seen_cards, keys, values, hits):
+    # Sorted by key, written next to the target and swapped in, so readers never see a partial table
+    order = np.argsort(keys, kind="stable")
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, TABLE_VERSION, hand_cards, seen_cards, len(keys)))
+        f.write(keys[order].astype("<u8").tobytes())
+        f.write(values[order].astype("<f4").tobytes())
+        f.write(hits[order].astype("<f4").tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def build(path=POLICY_PATH, hand_cards=HAND_CARDS, seen_cards=SEEN_CARDS, workers=1, log=None):
+    """Build or extend the table at `path`; returns the number of new solves.
+
+    Incremental: removed multisets already in a table of the same version and
+    hand size are kept, so raising `seen_cards` or resuming an interrupted
+    build only solves what's missing. The file is rewritten every
+    CHECKPOINT_SOLVES solves.
+    """
+    parts = []
+    done = set()
+    existing = open_table(path)
+    if existing is not None and existing.hand_cards == hand_cards:
+        parts.append((np.array(existing.keys), np.array(existing.values), np.array(existing.hits)))
+        done = {int(code) for code in np.unique(parts[0][0] >> np.uint64(BUST_SHIFT + 2))}
+        seen_cards = max(seen_cards, existing.seen_cards)
+    del existing  # drop the mapping before the file is replaced
+
+    todo = [removed for removed in seen_multisets(seen_cards) if _seen_code(removed) not in done]
+    if not todo:
+        return 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def checkpoint():
+        keys, values, hits = (np.concatenate(column) for column in zip(*parts))
+        write_table(path, hand_cards, seen_cards, keys, values, hits)
+        # Fold into one part so later checkpoints don't re-concatenate every solve
+        parts[:] = [(keys, values, hits)]
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(solve_seen, todo, itertools.repeat(hand_cards), chunksize=1)
+    else:
+        executor = None
+        results = (solve_seen(removed, hand_cards) for removed in todo)
+    try:
+        for n, part in enumerate(results, start=1):
+            parts.append(part)
+            if n % CHECKPOINT_SOLVES == 0 or n == len(todo):
+                checkpoint()
+                if log:
+                    log(f"{n}/{len(todo)} solved, {len(parts[0][0])} states")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return len(todo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build (or extend) the precomputed Advisor lookahead table.")
+    parser.add_argument("--path", default=POLICY_PATH)
+    parser.add_argument("--hand", type=int, default=HAND_CARDS, help="largest hand (number/modifier cards) stored")
+    parser.add_argument("--seen", type=int, default=SEEN_CARDS, help="most number/modifier cards gone from the deck")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (0 = one per CPU)")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    solved = build(args.path, args.hand, args.seen, workers, log=lambda msg: print(msg, file=sys.stderr))
+    table = open_table(args.path)
+    print(f"{solved} new solves; {len(table) if table else 0} states in {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# ---------------------
+# Imports
+# ---------------------
+
+# ---------------------
+# Rulesets
+# ---------------------
+# Everything a house variant can change. The card kinds themselves are fixed
+# (hands are bit-encoded by kind, see advisor_logic.hand_key), so a variant sets
+# how many copies of each card the deck has, the Flip 7 bonus, what x2
+# multiplies the numbers by and the total that ends the game. A hand holds each
+# modifier at most once, so modifiers and x2 come in 0 or 1 copies.
+# advisor_logic.compile_rules() turns a ruleset into its derived tables once.
+STANDARD_DECK = {
+    **{str(i): max(i, 1) for i in range(13)},
+    "sc": 3, "f3": 3, "fr": 3,
+    "+2": 1, "+4": 1, "+6": 1, "+8": 1, "+10": 1,
+    "x2": 1,
+}
+
+
+_SINGLE_CARDS = ("+2", "+4", "+6", "+8", "+10", "x2")
+
+
+class Ruleset:
+    """One set of game rules. Compares and hashes by its rules (not its name), so it can key caches.
+
+    `deck` maps cards to copies and only needs the ones that differ from
+    STANDARD_DECK.
+    """
+
+    __slots__ = ("name", "deck", "flip_seven_bonus", "multiplier", "target_score", "_key", "_hash")
+
+    def __init__(self, name="Standard", deck=None, flip_seven_bonus=15, multiplier=2, target_score=200):
+        deck = dict(deck or {})
+        unknown = [card for card in deck if card not in STANDARD_DECK]
+        if unknown:
+            raise ValueError(f"Unknown cards in ruleset deck: {', '.join(map(str, unknown))}")
+        copies = {**STANDARD_DECK, **deck}
+        if any(not isinstance(n, int) or n < 0 for n in copies.values()):
+            raise ValueError("Card copies must be non-negative integers")
+        repeated = [card for card in _SINGLE_CARDS if copies[card] > 1]
+        if repeated:
+            raise ValueError(f"Modifiers and x2 can't have more than one copy: {', '.join(repeated)}")
+        if flip_seven_bonus < 0 or multiplier < 1 or target_score < 1:
+            raise ValueError("Flip 7 bonus must be >= 0, multiplier >= 1 and target score >= 1")
+
+        self.name = name
+        self.deck = tuple(copies.items())
+        self.flip_seven_bonus = int(flip_seven_bonus)
+        self.multiplier = int(multiplier)
+        self.target_score = int(target_score)
+        self._key = (self.deck, self.flip_seven_bonus, self.multiplier, self.target_score)
+        self._hash = hash(self._key)
+
+    def replace(self, **changes):
+        """Copy with some rules changed; `deck` entries update this ruleset's deck."""
+        fields = {
+            "name": self.name,
+            "deck": {**dict(self.deck), **changes.pop("deck", {})},
+            "flip_seven_bonus": self.flip_seven_bonus,
+            "multiplier": self.multiplier,
+            "target_score": self.target_score,
+        }
+        return Ruleset(**{**fields, **changes})
+
+    def key(self):
+        return self._key
+
+    def __eq__(self, other):
+        if not isinstance(other, Ruleset):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Rebuilt on unpickling: string hashes differ between processes, so _hash can't travel
+        return Ruleset, (self.name, self._changed(), self.flip_seven_bonus, self.multiplier, self.target_score)
+
+    def __repr__(self):
+        return (
+            f"Ruleset({self.name!r}, deck={self._changed()}, flip_seven_bonus={self.flip_seven_bonus}, "
+            f"multiplier={self.multiplier}, target_score={self.target_score})"
+        )
+
+    def _changed(self):
+        return {card: n for card, n in self.deck if STANDARD_DECK[card] != n}
+
+
+DEFAULT_RULES = Ruleset()
@@ -2,16 +2,294 @@
 # Imports
 # ---------------------
 from . import default_fields as default
-import streamlit as st
+from collections import deque
 from typing import List
-import re
+import uuid
+import numpy as np
+from src.core.perf import instrument
+from src.core.storage import SNAPSHOT_EVERY
+from src.core.tokenizer import parse_score
+
+
+# ---------------------
+# Score History
+# ---------------------
+class ScoreHistory:
+    """Rounds x players score array with running totals kept up to date on append.
+
+    Storage doubles when full, so appends are amortized O(players) and totals are
+    read without touching past rounds. Iterating yields each round as a list,
+    like the list-of-lists it replaces.
+    """
+
+    __slots__ = ("_data", "rounds", "totals")
+
+    def __init__(self, n_players=0, capacity=16):
+        self._data = np.zeros((capacity, n_players))
+        self.rounds = 0
+        self.totals = np.zeros(n_players)
+
+    @classmethod
+    def from_rows(cls, rows):
+        history = cls(max((len(r) for r in rows), default=0), max(len(rows), 16))
+        for r in rows:
+            history.append(r)
+        return history
+
+    def _grow(self, rounds, width):
+        capacity, old_width = self._data.shape
+        new_capacity = capacity * 2 if rounds > capacity else capacity
+        new_width = max(width, old_width * 2) if width > old_width else old_width
+        data = np.zeros((new_capacity, new_width))
+        data[: self.rounds, :old_width] = self._data[: self.rounds]
+        self._data = data
+        totals = np.zeros(new_width)
+        totals[:old_width] = self.totals
+        self.totals = totals
+
+    def append(self, scores):
+        capacity, width = self._data.shape
+        if self.rounds + 1 > capacity or len(scores) > width:
+            self._grow(self.rounds + 1, len(scores))
+        row = self._data[self.rounds]
+        row[: len(scores)] = scores
+        self.totals += row
+        self.rounds += 1
+
+    def pop(self):
+        """Drop the last round (undo of append); returns its scores."""
+        self.rounds -= 1
+        row = self._data[self.rounds]
+        scores = row.tolist()
+        self.totals -= row
+        row[:] = 0
+        return scores
+
+    def set_score(self, round_idx, player, value):
+        """Overwrite one cell, adjusting that player's total by the difference; returns the old value."""
+        if player >= self._data.shape[1]:
+            self._grow(self.rounds, player + 1)
+        old = float(self._data[round_idx, player])
+        self._data[round_idx, player] = value
+        self.totals[player] += value - old
+        return old
+
+    def as_array(self, n_players):
+        """Rounds x n_players view (zero-padded if players were added later)."""
+        width = self._data.shape[1]
+        if n_players <= width:
+            return self._data[: self.rounds, :n_players]
+        padded = np.zeros((self.rounds, n_players))
+        padded[:, :width] = self._data[: self.rounds]
+        return padded
+
+    def player_totals(self, n_players):
+        totals = [0.0] * n_players
+        width = min(n_players, len(self.totals))
+        totals[:width] = self.totals[:width].tolist()
+        return totals
+
+    def __len__(self):
+        return self.rounds
+
+    def __iter__(self):
+        return iter(self._data[: self.rounds].tolist())
+
+    def __getitem__(self, idx):
+        return self._data[: self.rounds][idx].tolist()
+
+
+def _state(session_state):
+    # Streamlit is only needed when no state dict is passed in, so headless callers never import it
+    if session_state is not None:
+        return session_state
+    import streamlit as st
+    return st.session_state
+
+
+def get_history(ss):
+    # Older sessions may still hold a plain list of rounds
+    history = ss.get("history")
+    if not isinstance(history, ScoreHistory):
+        history = ScoreHistory.from_rows(history or [])
+        ss["history"] = history
+    return history
+
+
+# ---------------------
+# Persistence
+# ---------------------
+# Sessions with a "game_store" (see storage.GameStore) log every change to it;
+# plain dicts without one (benchmarks, the CLI) stay in memory
+def _restore(ss, game_id, saved):
+    ss["game_id"] = game_id
+    ss["log_seq"] = saved["seq"]
+    ss["players"] = saved["players"]
+    ss["player_count"] = len(saved["players"])
+    ss["history"] = ScoreHistory.from_rows(saved["rows"])
+    ss["round"] = saved["round"]
+    ss["game_started"] = saved["game_started"]
+    ss["current_round_inputs"] = ["" for _ in saved["players"]]
+    bump_history_version(ss)
+
+
+def _log(ss, op, **fields):
+    store = ss.get("game_store")
+    if store is None:
+        return
+    if not _claim(ss, store):
+        _fork(ss, store)  # logs the whole state, this change included
+        return
+    seq = store.append(ss["game_id"], {"op": op, **fields})
+    ss["log_seq"] = seq
+    if op == "round" and ss.get("round", 1) % SNAPSHOT_EVERY == 0:
+        players = ss.get("players", [])
+        store.snapshot(ss["game_id"], {
+            "seq": seq,
+            "players": list(players),
+            "rows": get_history(ss).as_array(len(players)).tolist(),
+            "round": ss["round"],
+            "game_started": ss.get("game_started", False),
+        })
+
+
+def _claim(ss, store):
+    # Sessions without a writer id (tables, which have their own lock) never compete
+    writer = ss.get("game_writer")
+    return writer is None or store.claim(ss["game_id"], writer)
+
+
+def _fork(ss, store):
+    # Another live session writes this game (a second tab on the same ?game= link), so
+    # this one carries on as a copy under a new id that starts from the current state
+    ss["forked_from"] = ss["game_id"]
+    ss["game_id"] = uuid.uuid4().hex
+    _claim(ss, store)
+    players = list(ss.get("players", []))
+    ss["log_seq"] = store.append(ss["game_id"], {"op": "start", "players": players})
+    ss["log_seq"] = store.append(ss["game_id"], {
+        "op": "restore",
+        "rows": get_history(ss).as_array(len(players)).tolist(),
+        "round": ss.get("round", 1),
+        "game_started": ss.get("game_started", False),
+    })
+
+
+# ---------------------
+# Undo / Redo
+# ---------------------
+# Every change to a running game is an action tuple that can be applied forwards
+# or backwards in O(players), kept on bounded undo/redo stacks:
+#   ("round", scores)                          commit_round
+#   ("edit", round_idx, player, old, new)      edit_score
+#   ("add_player", name)                       add_player
+#   ("restart", history, round, game_started)  restart_game (keeps the old ScoreHistory)
+UNDO_LIMIT = 100
+
+
+def _apply(ss, action, forward=True):
+    kind = action[0]
+    if kind == "round":
+        if forward:
+            get_history(ss).append(action[1])
+            ss["round"] = ss.get("round", 1) + 1
+            _log(ss, "round", scores=action[1])
+        else:
+            get_history(ss).pop()
+            ss["round"] = ss.get("round", 1) - 1
+            _log(ss, "pop")
+    elif kind == "edit":
+        _, round_idx, player, old, new = action
+        value = new if forward else old
+        get_history(ss).set_score(round_idx, player, value)
+        _log(ss, "edit", round=round_idx, player=player, value=value)
+    elif kind == "add_player":
+        players = list(ss.get("players", []))
+        if forward:
+            players.append(action[1])
+            _log(ss, "add_player", name=action[1])
+        else:
+            players.pop()
+            _log(ss, "remove_player")
+        ss["players"] = players
+        ss["player_count"] = len(players)
+        ss["current_round_inputs"] = ["" for _ in players]
+    elif kind == "restart":
+        players = ss.get("players") or ["", "", ""]
+        if forward:
+            ss["history"] = ScoreHistory(len(players))
+            ss["round"] = 1
+            ss["game_started"] = False
+            _log(ss, "restart")
+        else:
+            _, history, round_num, started = action
+            ss["history"] = history
+            ss["round"] = round_num
+            ss["game_started"] = started
+            _log(ss, "restore", rows=history.as_array(len(players)).tolist(), round=round_num, game_started=started)
+        ss["current_round_inputs"] = ["" for _ in players]
+    bump_history_version(ss)
+
+
+def _do(ss, action):
+    undo_stack = ss.get("undo_stack")
+    if undo_stack is None:
+        undo_stack = ss["undo_stack"] = deque(maxlen=UNDO_LIMIT)
+    _apply(ss, action)
+    undo_stack.append(action)
+    ss["redo_stack"] = deque(maxlen=UNDO_LIMIT)
+
+
+def can_undo(session_state=None):
+    return bool(_state(session_state).get("undo_stack"))
+
+
+def can_redo(session_state=None):
+    return bool(_state(session_state).get("redo_stack"))
+
+
+def undo(session_state=None):
+    """Revert the last action; returns it (None if there was nothing to undo)."""
+    ss = _state(session_state)
+    if not can_undo(ss):
+        return None
+    action = ss["undo_stack"].pop()
+    _apply(ss, action, forward=False)
+    ss.setdefault("redo_stack", deque(maxlen=UNDO_LIMIT)).append(action)
+    return action
+
+
+def redo(session_state=None):
+    """Reapply the last undone action; returns it (None if there was nothing to redo)."""
+    ss = _state(session_state)
+    if not can_redo(ss):
+        return None
+    action = ss["redo_stack"].pop()
+    _apply(ss, action)
+    ss["undo_stack"].append(action)
+    return action
 
 
 # ---------------------
 # Scoring Functions
 # ---------------------
-def initialize_session_state(session_state=None):
-    ss = session_state or st.session_state
+def initialize_session_state(session_state=None, store=None, game_id=None, writer=None):
+    """Fill in missing state; with a `store`, the first call resumes `game_id` if it was saved.
+
+    `writer` identifies this session to the store (see GameStore.claim): a game
+    another live session is writing is resumed as a copy under a new id, with
+    the old id left in "forked_from".
+    """
+    ss = _state(session_state)
+    resumed = False
+    if store is not None and ss.get("game_store") is None:
+        # First run of this session with persistence: resume `game_id` if it was saved
+        ss["game_store"] = store
+        ss["game_writer"] = writer
+        saved = store.load(game_id) if game_id else None
+        if saved is not None:
+            _restore(ss, game_id, saved)
+            resumed = True
     if ss.get("players") is None:
         ss["players"] = default.DEFAULT_NAMES  # default four players
     if ss.get("player_count") is None:
@@ -19,98 +297,76 @@ def initialize_session_state(session_state=None):
     if ss.get("round") is None:
         ss["round"] = 1
     if ss.get("history") is None:
-        ss["history"] = []  # list of rounds, each is list of floats
+        ss["history"] = ScoreHistory()  # rounds x players, with running totals
     if ss.get("game_started") is None:
         ss["game_started"] = False
+    if ss.get("game_id") is None:
+        ss["game_id"] = uuid.uuid4().hex  # identifies this game's history in shared caches
+    if ss.get("history_version") is None:
+        ss["history_version"] = 0  # bumped on every history change
+    if resumed and not _claim(ss, store):
+        _fork(ss, store)
     return ss
 
 
+def bump_history_version(session_state=None):
+    ss = _state(session_state)
+    ss["history_version"] = ss.get("history_version", 0) + 1
+
+
 def add_player(name: str, session_state=None):
-    ss = session_state or st.session_state
-    players = ss.get("players", [])
-    players.append(name)
-    ss["players"] = players
+    _do(_state(session_state), ("add_player", name))
 
 
-def restart_game(session_state=None):
-    ss = session_state or st.session_state
-    # Preserve current players, just reset the game state
-    current_players = ss.get("players")
-    if current_players is None:
-        current_players = ["", "", ""]
+def start_game(names: List[str], session_state=None):
+    ss = _state(session_state)
+    ss["players"] = names
+    ss["history"] = ScoreHistory(len(names))
+    bump_history_version(ss)
     ss["round"] = 1
-    ss["history"] = []
-    ss["game_started"] = False
-    ss["current_round_inputs"] = ["" for _ in current_players]
+    ss["current_round_inputs"] = ["" for _ in names]
+    ss["game_started"] = True
+    ss["undo_stack"] = deque(maxlen=UNDO_LIMIT)  # a new game starts a fresh undo history
+    ss["redo_stack"] = deque(maxlen=UNDO_LIMIT)
+    _log(ss, "start", players=list(names))
+
+
+def restart_game(session_state=None):
+    ss = _state(session_state)
+    # Preserve current players, just reset the game state (the old history stays on the undo stack)
+    _do(ss, ("restart", get_history(ss), ss.get("round", 1), ss.get("game_started", False)))
 
 
 def commit_round(scores: List[float], session_state=None):
-    ss = session_state or st.session_state
+    ss = _state(session_state)
     players = ss.get("players", [])
     n = len(players)
     if len(scores) < n:
         scores = scores + [0.0] * (n - len(scores))
     # store as floats
     scores = [float(x) for x in scores]
-    history = ss.get("history", [])
-    history.append(scores)
-    ss["history"] = history
-    ss["round"] = ss.get("round", 1) + 1
+    _do(ss, ("round", scores))
+
 
+def edit_score(round_idx: int, player: int, value: float, session_state=None):
+    """Change one committed score (round_idx is 0-based)."""
+    ss = _state(session_state)
+    row = get_history(ss)[round_idx]
+    old = row[player] if player < len(row) else 0.0  # players added later have no stored cell yet
+    _do(ss, ("edit", round_idx, player, old, float(value)))
 
+
+@instrument("current_totals")
 def current_totals(session_state=None):
-    ss = session_state or st.session_state
+    ss = _state(session_state)
     players = ss.get("players", [])
-    n = len(players)
-    totals = [0.0] * n
-    for r in ss.get("history", []):
-        for i in range(n):
-            if i < len(r):
-                totals[i] += float(r[i])
-    return totals
+    return get_history(ss).player_totals(len(players))
 
 
+@instrument("parse_score_input")
 def parse_score_input(s: str) -> float:
-    from src.core.advisor_logic import calc_score
-
     if s is None:
         return 0.0
     if isinstance(s, (int, float)):
         return float(s)
-    txt = str(s).strip()
-    if txt == "":
-        return 0.0
-
-    # Aliases for easier typing
-    CARD_ALIASES = {
-        "-2": "+2",
-        "-4": "+4",
-        "-6": "+6",
-        "-8": "+8",
-        "-10": "+10",
-        "!": "x2",
-        "$": "sc",
-        "&": "fr",
-        "@": "f3",
-    }
-
-    # Try to parse as card tokens (comma-separated)
-    tokens = [t.strip().lower() for t in txt.split(",")]
-    tokens = [CARD_ALIASES.get(t, t) for t in tokens if t]
-
-    # Check if all tokens look like valid cards
-    valid_cards = set(
-        [str(i) for i in range(13)]
-        + ["+2", "+4", "+6", "+8", "+10"]
-        + ["x2", "sc", "f3", "fr"]
-    )
-    if all(t in valid_cards for t in tokens):
-        return float(calc_score(tokens))
-
-    # Fallback: treat as plain number(s)
-    nums = re.findall(r"[-+]?\d*\.?\d+", txt)
-    if nums:
-        if len(nums) == 1:
-            return float(nums[0])
-        return sum(float(n) for n in nums)
-    return 0.0
+    return parse_score(str(s))[1]
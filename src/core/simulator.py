@@ -0,0 +1,411 @@
+# ---------------------
+# Imports
+# ---------------------
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from src.core.advisor_logic import (
+    CARD_KINDS,
+    KIND_INDEX,
+    NUMBER_KINDS,
+    _MODIFIER_BIT,
+    _NUMBER_BIT,
+    compile_rules,
+)
+from src.core.rules import DEFAULT_RULES
+
+# ---------------------
+# Constants
+# ---------------------
+TARGET_SCORE = DEFAULT_RULES.target_score
+FLIP_THREE_DRAWS = 3
+MAX_ROUNDS = 1000  # safety valve for policies that never score
+
+SC = KIND_INDEX["sc"]
+F3 = KIND_INDEX["f3"]
+FR = KIND_INDEX["fr"]
+_KIND_BITS = [_NUMBER_BIT.get(card) or _MODIFIER_BIT.get(card) or 0 for card in CARD_KINDS]
+_NUMBER_MASK = sum(1 << num for num in NUMBER_KINDS)
+
+
+# ---------------------
+# Policies
+# ---------------------
+class PlayerView:
+    """What a policy sees when deciding: its own hand and the public table state.
+
+    `hand` is the advisor hand key (see advisor_logic.hand_key), `deck` the draw
+    pile counts indexed like CARD_KINDS and `table` the game's score table.
+    """
+
+    __slots__ = ("seat", "hand", "has_sc", "round_score", "total", "totals", "deck", "cards_left", "target", "table")
+
+    def __init__(self, seat, totals, deck, target, table):
+        self.seat = seat
+        self.hand = 0
+        self.has_sc = False
+        self.round_score = 0
+        self.total = 0
+        self.totals = totals
+        self.deck = deck
+        self.cards_left = 0
+        self.target = target
+        self.table = table
+
+
+class ThresholdPolicy:
+    """Hit until the round score reaches `threshold`, then stay."""
+
+    __slots__ = ("threshold",)
+
+    def __init__(self, threshold=25):
+        self.threshold = threshold
+
+    def __call__(self, view):
+        return view.round_score < self.threshold
+
+    def __repr__(self):
+        return f"ThresholdPolicy({self.threshold})"
+
+
+class OneStepEVPolicy:
+    """The Advisor's check_bust rule: hit while the one-draw expected gain is positive."""
+
+    __slots__ = ()
+
+    def __call__(self, view):
+        table = view.table
+        curr = table[view.hand]
+        gain = 0
+        for idx, count in enumerate(view.deck):
+            bit = _KIND_BITS[idx]
+            if not count or not bit:
+                continue
+            if idx in NUMBER_KINDS and view.hand & bit:
+                if not view.has_sc:  # a held Second Chance takes the repeat instead
+                    gain -= count * curr
+            else:
+                gain += count * (table[view.hand | bit] - curr)
+        return gain > 0
+
+    def __repr__(self):
+        return "OneStepEVPolicy()"
+
+
+class RiskTolerancePolicy:
+    """Hit while the chance of busting on the next draw is below `max_bust`."""
+
+    __slots__ = ("max_bust",)
+
+    def __init__(self, max_bust=0.25):
+        self.max_bust = max_bust
+
+    def __call__(self, view):
+        if not view.cards_left:
+            return False
+        if view.has_sc:
+            return True  # the next repeat only costs the Second Chance
+        bust = sum(view.deck[num] for num in NUMBER_KINDS if view.hand >> num & 1)
+        return bust / view.cards_left < self.max_bust
+
+    def __repr__(self):
+        return f"RiskTolerancePolicy({self.max_bust})"
+
+
+def choose_action_target(view, active, round_scores):
+    # Freeze / Flip 3 the active opponent closest to winning; yourself if nobody else is in
+    best = None
+    best_score = -1
+    for seat, is_active in enumerate(active):
+        if is_active and seat != view.seat:
+            score = view.totals[seat] + round_scores[seat]
+            if score > best_score:
+                best, best_score = seat, score
+    return view.seat if best is None else best
+
+
+# ---------------------
+# Statistics
+# ---------------------
+class SimulationStats:
+    """Integer aggregates over many games, so merging is exact in any order."""
+
+    __slots__ = ("games", "rounds", "wins", "final_scores", "busts", "flip_sevens", "draws", "reshuffles")
+
+    def __init__(self, n_players=0):
+        self.games = 0
+        self.rounds = 0
+        self.wins = [0] * n_players
+        self.final_scores = [0] * n_players
+        self.busts = [0] * n_players
+        self.flip_sevens = [0] * n_players
+        self.draws = 0
+        self.reshuffles = 0
+
+    def merge(self, other):
+        if not self.wins:
+            n = len(other.wins)
+            self.wins, self.final_scores, self.busts, self.flip_sevens = [0] * n, [0] * n, [0] * n, [0] * n
+        self.games += other.games
+        self.rounds += other.rounds
+        self.draws += other.draws
+        self.reshuffles += other.reshuffles
+        for i in range(len(other.wins)):
+            self.wins[i] += other.wins[i]
+            self.final_scores[i] += other.final_scores[i]
+            self.busts[i] += other.busts[i]
+            self.flip_sevens[i] += other.flip_sevens[i]
+        return self
+
+    def to_dict(self):
+        games = max(self.games, 1)
+        return {
+            "games": self.games,
+            "rounds_per_game": self.rounds / games,
+            "win_rate": [w / games for w in self.wins],
+            "avg_final_score": [s / games for s in self.final_scores],
+            "busts_per_game": [b / games for b in self.busts],
+            "flip_sevens_per_game": [f / games for f in self.flip_sevens],
+            "reshuffles_per_game": self.reshuffles / games,
+        }
+
+
+# ---------------------
+# Game Engine
+# ---------------------
+class _Game:
+    # One game's mutable state; the deck and discard pile persist across rounds
+    def __init__(self, policies, rng, stats, target=TARGET_SCORE, rules=None):
+        compiled = compile_rules(rules)
+        self.policies = policies
+        self.n = len(policies)
+        self.rng = rng
+        self.stats = stats
+        self.target = target
+        self.table = compiled.score_table
+
+        self.pile = [idx for idx, count in enumerate(compiled.counts) for _ in range(count)]
+        rng.shuffle(self.pile)
+        self.counts = [0] * len(CARD_KINDS)
+        for idx in self.pile:
+            self.counts[idx] += 1
+        self.discard = []
+        self.totals = [0] * self.n
+        self.views = [PlayerView(seat, self.totals, self.counts, target, self.table) for seat in range(self.n)]
+
+    def draw(self):
+        if not self.pile:
+            if not self.discard:
+                return None
+            self.pile, self.discard = self.discard, []
+            self.rng.shuffle(self.pile)
+            for idx in self.pile:
+                self.counts[idx] += 1
+            self.stats.reshuffles += 1
+        idx = self.pile.pop()
+        self.counts[idx] -= 1
+        self.stats.draws += 1
+        return idx
+
+    def play(self):
+        rounds = 0
+        while rounds < MAX_ROUNDS:
+            self.play_round(first=rounds % self.n)
+            rounds += 1
+            best = max(self.totals)
+            if best >= self.target and self.totals.count(best) == 1:
+                break
+        self.stats.games += 1
+        self.stats.rounds += rounds
+        self.stats.wins[self.totals.index(max(self.totals))] += 1
+        for seat, total in enumerate(self.totals):
+            self.stats.final_scores[seat] += total
+
+    def play_round(self, first):
+        n = self.n
+        self.keys = [0] * n
+        self.has_sc = [False] * n
+        self.active = [True] * n
+        self.busted = [False] * n
+        self.hands = [[] for _ in range(n)]
+        self.ended = False
+
+        order = [(first + i) % n for i in range(n)]
+        while not self.ended and any(self.active):
+            for seat in order:
+                if not self.active[seat]:
+                    continue
+                # Everyone takes the opening card; after that the policy decides
+                if self.hands[seat] and not self.policies[seat](self.view(seat)):
+                    self.active[seat] = False
+                    continue
+                card = self.draw()
+                if card is None:
+                    self.active[seat] = False
+                    continue
+                self.take(seat, card)
+                if self.ended:
+                    break
+
+        for seat in range(n):
+            if not self.busted[seat]:
+                self.totals[seat] += self.table[self.keys[seat]]
+            self.discard.extend(self.hands[seat])
+
+    def view(self, seat):
+        view = self.views[seat]
+        view.hand = self.keys[seat]
+        view.has_sc = self.has_sc[seat]
+        view.round_score = self.table[self.keys[seat]]
+        view.total = self.totals[seat]
+        view.cards_left = len(self.pile)
+        return view
+
+    def round_scores(self):
+        return [0 if self.busted[s] else self.table[self.keys[s]] for s in range(self.n)]
+
+    def take(self, seat, card, forced=False):
+        # Give `card` to `seat`; returns the card if it is an action set aside during Flip 3
+        self.hands[seat].append(card)
+        bit = _KIND_BITS[card]
+        if bit:
+            if card in NUMBER_KINDS and self.keys[seat] & bit:
+                if self.has_sc[seat]:
+                    self.has_sc[seat] = False
+                else:
+                    self.busted[seat] = True
+                    self.active[seat] = False
+                    self.stats.busts[seat] += 1
+                return None
+            self.keys[seat] |= bit
+            if bin(self.keys[seat] & _NUMBER_MASK).count("1") == 7:
+                self.stats.flip_sevens[seat] += 1
+                self.ended = True
+            return None
+
+        if card == SC:
+            if not self.has_sc[seat]:
+                self.has_sc[seat] = True
+            else:
+                # Pass a spare Second Chance to someone still in without one
+                for other in range(self.n):
+                    if self.active[other] and not self.has_sc[other]:
+                        self.has_sc[other] = True
+                        self.hands[seat].pop()
+                        self.hands[other].append(card)
+                        break
+            return None
+
+        if forced:
+            return card
+        self.resolve_action(seat, card)
+        return None
+
+    def resolve_action(self, seat, card):
+        target = choose_action_target(self.view(seat), self.active, self.round_scores())
+        if card == FR:
+            self.active[target] = False
+            return
+
+        pending = []
+        for _ in range(FLIP_THREE_DRAWS):
+            drawn = self.draw()
+            if drawn is None:
+                break
+            held = self.take(target, drawn, forced=True)
+            if held is not None:
+                pending.append(held)
+            if self.busted[target] or self.ended:
+                return
+        for held in pending:
+            if self.ended:
+                return
+            self.resolve_action(target, held)
+
+
+def play_games(policies, n_games, seed, target=None, rules=None):
+    """Play `n_games` with one RNG stream under `rules` (DEFAULT_RULES if omitted); returns a SimulationStats.
+
+    `target` defaults to the ruleset's target score.
+    """
+    rules = rules or DEFAULT_RULES
+    target = target or rules.target_score
+    rng = random.Random(seed)
+    stats = SimulationStats(len(policies))
+    for _ in range(n_games):
+        _Game(policies, rng, stats, target, rules).play()
+    return stats
+
+
+# ---------------------
+# Parallel Runner
+# ---------------------
+def chunk_seed(seed, chunk):
+    # Independent stream per chunk, so results don't depend on how chunks map to workers
+    state = np.random.SeedSequence(seed, spawn_key=(chunk,)).generate_state(2)
+    return int(state[0]) << 32 | int(state[1])
+
+
+def _run_chunk(args):
+    policies, n_games, seed, target, rules = args
+    return play_games(policies, n_games, seed, target, rules)
+
+
+def map_chunks(chunks, workers=None):
+    """Run play_games over `chunks` of (policies, n_games, seed, target, rules), yielding (index, stats) as each finishes.
+
+    Only a couple of chunks per worker are in flight at once, so memory stays
+    flat however many chunks there are.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for i, chunk in enumerate(chunks):
+            yield i, _run_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        queue = iter(enumerate(chunks))
+        pending = {}
+        for i, chunk in queue:
+            pending[executor.submit(_run_chunk, chunk)] = i
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+                nxt = next(queue, None)
+                if nxt is not None:
+                    pending[executor.submit(_run_chunk, nxt[1])] = nxt[0]
+
+
+def iter_simulation(
+    n_games, policies=None, n_players=4, seed=0, workers=None, chunk_size=500, target=None, rules=None
+):
+    """Play `n_games` across a process pool, yielding the running SimulationStats after each chunk.
+
+    Games follow `rules` (DEFAULT_RULES if omitted) and end at `target`, the
+    ruleset's target score unless given.
+    """
+    if policies is None:
+        policies = [ThresholdPolicy() for _ in range(n_players)]
+    policies = list(policies)
+
+    chunks = [
+        (policies, min(chunk_size, n_games - start), chunk_seed(seed, i), target, rules)
+        for i, start in enumerate(range(0, n_games, chunk_size))
+    ]
+    total = SimulationStats(len(policies))
+    for _, stats in map_chunks(chunks, workers):
+        yield total.merge(stats)
+
+
+def simulate(n_games, policies=None, n_players=4, seed=0, workers=None, chunk_size=500, target=None, rules=None):
+    """Play `n_games` and return the final SimulationStats (see iter_simulation)."""
+    stats = SimulationStats(len(policies) if policies is not None else n_players)
+    for stats in iter_simulation(n_games, policies, n_players, seed, workers, chunk_size, target, rules):
+        pass
+    return stats
@@ -0,0 +1,224 @@
+# ---------------------
+# Imports
+# ---------------------
+import atexit
+import json
+import os
+import queue
+import threading
+
+# ---------------------
+# Settings
+# ---------------------
+DATA_DIR = os.environ.get("FLIP7_DATA_DIR", os.path.join("data", "games"))
+SNAPSHOT_EVERY = 50  # rounds between snapshots; a resume replays at most this many log entries
+
+
+# ---------------------
+# Replay
+# ---------------------
+# Each game is an append-only JSONL log, one event per line:
+#   {"seq": 1, "op": "start", "players": [...]}
+#   {"seq": 2, "op": "round", "scores": [...]}
+#   {"seq": 3, "op": "pop"}                                   (undo of a round)
+#   {"seq": 4, "op": "edit", "round": 0, "player": 1, "value": 12.0}
+#   {"seq": 5, "op": "add_player", "name": "Van"} / {"op": "remove_player"}
+#   {"seq": 9, "op": "restart"} / {"op": "restore", "rows": [...], "round": 4, "game_started": true}
+# plus a snapshot of the state after some seq, and the log offset just past it.
+def empty_state():
+    return {"seq": 0, "players": [], "rows": [], "round": 1, "game_started": False}
+
+
+def apply_event(state, event):
+    op = event["op"]
+    if op == "start":
+        state["players"] = list(event["players"])
+        state["rows"] = []
+        state["round"] = 1
+        state["game_started"] = True
+    elif op == "round":
+        state["rows"].append(list(event["scores"]))
+        state["round"] += 1
+    elif op == "pop":
+        state["rows"].pop()
+        state["round"] -= 1
+    elif op == "edit":
+        row = state["rows"][event["round"]]
+        row.extend([0.0] * (event["player"] + 1 - len(row)))
+        row[event["player"]] = event["value"]
+    elif op == "add_player":
+        state["players"].append(event["name"])
+    elif op == "remove_player":
+        state["players"].pop()
+    elif op == "restart":
+        state["rows"] = []
+        state["round"] = 1
+        state["game_started"] = False
+    elif op == "restore":
+        state["rows"] = [list(row) for row in event["rows"]]
+        state["round"] = event["round"]
+        state["game_started"] = event["game_started"]
+    state["seq"] = event["seq"]
+    return state
+
+
+# ---------------------
+# Store
+# ---------------------
+class GameStore:
+    """Round logs and snapshots for every game, one pair of files per game id.
+
+    append() and snapshot() only enqueue; a background thread drains the queue,
+    writes everything pending for a game in one write + fsync, so a commit never
+    waits on the disk. flush() blocks until the queue is empty. The store hands
+    out each game's seq numbers, so sessions sharing a game never reuse one.
+
+    Only one session writes a game at a time (see claim()); `is_live(writer)`
+    says whether a claiming session is still connected, and without it every
+    writer counts as live. Claims are per process, so one game id must not be
+    written by two server processes.
+    """
+
+    def __init__(self, directory=DATA_DIR, is_live=None):
+        self.directory = directory
+        self.is_live = is_live
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._seq_lock = threading.Lock()
+        self._seqs = {}  # game id -> last seq handed out (or loaded)
+        self._writers = {}  # game id -> the session writing it
+        self.last_error = None
+        self._opened = set()  # game ids whose log tail has been checked by this process
+        atexit.register(self.flush)
+
+    def _log_path(self, game_id):
+        return os.path.join(self.directory, f"{game_id}.jsonl")
+
+    def _snapshot_path(self, game_id):
+        return os.path.join(self.directory, f"{game_id}.snapshot.json")
+
+    # Writing
+    def append(self, game_id, event):
+        """Queue `event` under the game's next seq; returns that seq."""
+        # Taken and queued under one lock so the log stays in seq order
+        with self._seq_lock:
+            seq = self._seqs.get(game_id, 0) + 1
+            self._seqs[game_id] = seq
+            self._put(("event", game_id, {"seq": seq, **event}))
+        return seq
+
+    def claim(self, game_id, writer):
+        """Make `writer` the session writing `game_id`; False if another live session already is."""
+        with self._seq_lock:
+            holder = self._writers.get(game_id)
+            if holder is not None and holder != writer and (self.is_live is None or self.is_live(holder)):
+                return False
+            self._writers[game_id] = writer
+            return True
+
+    def snapshot(self, game_id, state):
+        """Queue a snapshot of `state` (as built by apply_event); it's written after every event queued before it."""
+        self._put(("snapshot", game_id, state))
+
+    def _put(self, item):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="flip7-game-store", daemon=True)
+                self._thread.start()
+        self._queue.put(item)
+
+    def flush(self):
+        if self._thread is not None:
+            self._queue.join()
+
+    def _writer(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+                self.last_error = None
+            except OSError as exc:
+                self.last_error = exc  # keep the writer alive; the page can surface this
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        os.makedirs(self.directory, exist_ok=True)
+        # Group per game, keeping each game's events and snapshots in order
+        per_game = {}
+        for kind, game_id, payload in batch:
+            per_game.setdefault(game_id, []).append((kind, payload))
+
+        for game_id, items in per_game.items():
+            lines = []
+            snapshots = []
+            with open(self._log_path(game_id), "a", encoding="utf-8") as f:
+                if game_id not in self._opened:
+                    self._opened.add(game_id)
+                    if f.tell() and not self._ends_with_newline(game_id):
+                        lines.append("\n")  # end a torn line so the next event starts clean
+                for kind, payload in items:
+                    if kind == "event":
+                        lines.append(json.dumps(payload, separators=(",", ":")) + "\n")
+                    else:
+                        # Offset just past the events queued before this snapshot
+                        f.write("".join(lines))
+                        lines = []
+                        snapshots.append({**payload, "offset": f.tell()})
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            if snapshots:
+                self._write_snapshot(game_id, snapshots[-1])
+
+    def _ends_with_newline(self, game_id):
+        with open(self._log_path(game_id), "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _write_snapshot(self, game_id, snapshot):
+        path = self._snapshot_path(game_id)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    # Reading
+    def load(self, game_id):
+        """State of `game_id` from its latest snapshot plus the log tail, or None if it was never saved."""
+        self.flush()
+        if not self.exists(game_id):
+            return None
+        log_path = self._log_path(game_id)
+
+        state, offset = empty_state(), 0
+        try:
+            with open(self._snapshot_path(game_id), encoding="utf-8") as f:
+                state = json.load(f)
+            offset = state.pop("offset")
+        except (OSError, ValueError, KeyError):
+            state, offset = empty_state(), 0  # no usable snapshot: replay the whole log
+
+        with open(log_path, encoding="utf-8") as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn line from a crash mid-write
+                if event["seq"] > state["seq"]:
+                    apply_event(state, event)
+        with self._seq_lock:
+            self._seqs[game_id] = max(self._seqs.get(game_id, 0), state["seq"])
+        return state
+
+    def exists(self, game_id):
+        # Ids arrive from the URL, so anything but a plain token is never a saved game
+        return isinstance(game_id, str) and game_id.isalnum() and os.path.exists(self._log_path(game_id))
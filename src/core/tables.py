@@ -0,0 +1,173 @@
+# ---------------------
+# Imports
+# ---------------------
+import threading
+import uuid
+from bisect import bisect_left, insort
+
+from src.core import scoring
+
+# ---------------------
+# Settings
+# ---------------------
+LEADERBOARD_SIZE = 50  # rows shown by default; the full board is still kept
+
+
+# ---------------------
+# Tables
+# ---------------------
+class Table:
+    """One game at an event: a scoring state dict (as the Scorer keeps in
+    session_state) guarded by its own lock, so tables never wait on each other.
+    """
+
+    __slots__ = ("table_id", "name", "state", "lock")
+
+    def __init__(self, table_id, name, players, store=None):
+        self.table_id = table_id
+        self.name = name
+        self.lock = threading.Lock()
+        self.state = scoring.initialize_session_state({"players": list(players), "game_id": table_id}, store=store)
+        scoring.start_game(list(players), self.state)
+
+
+class TableView:
+    """Immutable copy of a table for rendering, taken under the table lock."""
+
+    __slots__ = ("table_id", "name", "players", "totals", "round", "version", "can_undo", "can_redo")
+
+    def __init__(self, table):
+        state = table.state
+        self.table_id = table.table_id
+        self.name = table.name
+        self.players = tuple(state["players"])
+        self.totals = tuple(scoring.current_totals(state))
+        self.round = state["round"]
+        self.version = state["history_version"]
+        self.can_undo = scoring.can_undo(state)
+        self.can_redo = scoring.can_redo(state)
+
+
+def _commit_if_current(scores, expected_round, state):
+    # Runs under the table lock, so the round can't move between the check and the commit
+    if expected_round is not None and state["round"] != expected_round:
+        return False
+    scoring.commit_round(scores, state)
+    return True
+
+
+# ---------------------
+# Registry
+# ---------------------
+class TableRegistry:
+    """Every table in the process, plus a leaderboard kept up to date as rounds land.
+
+    The registry lock only guards the table dict; each table has its own lock for
+    scoring, and the leaderboard has a third. The board is a sorted list; a change
+    at a table moves only that table's rows (a bisect per seat), so nothing is
+    re-sorted or rebuilt per view.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._board_lock = threading.Lock()
+        self._rows = {}  # (table_id, seat) -> its entry in _board
+        self._board = []  # (-total, table_id, seat, player, table name, round), best first
+        self._versions = {}  # table_id -> history version its rows were taken from
+
+    # Tables
+    def create(self, name, players):
+        table = Table(uuid.uuid4().hex, name, players, self.store)
+        with self._lock:
+            self._tables[table.table_id] = table
+        self._update_board(table)
+        return table.table_id
+
+    def remove(self, table_id):
+        with self._lock:
+            table = self._tables.pop(table_id, None)
+        if table is not None:
+            with self._board_lock:
+                for key in [key for key in self._rows if key[0] == table_id]:
+                    self._drop(key)
+                self._versions[table_id] = float("inf")  # an update still in flight can't re-add it
+
+    def tables(self):
+        with self._lock:
+            tables = list(self._tables.values())
+        return [self.view(table.table_id) for table in tables]
+
+    def get(self, table_id):
+        with self._lock:
+            return self._tables.get(table_id)
+
+    def _table(self, table_id):
+        table = self.get(table_id)
+        if table is None:
+            raise KeyError(f"No table {table_id!r}")
+        return table
+
+    def view(self, table_id):
+        table = self.get(table_id)
+        if table is None:
+            return None
+        with table.lock:
+            return TableView(table)
+
+    def read(self, table_id, fn):
+        """fn(state) under the table lock, for reads that walk the history (e.g. cache.get_history_table)."""
+        table = self._table(table_id)
+        with table.lock:
+            return fn(table.state)
+
+    # Scoring
+    def _act(self, table_id, action, *args):
+        table = self._table(table_id)
+        with table.lock:
+            result = action(*args, table.state)
+        self._update_board(table)
+        return result
+
+    def commit_round(self, table_id, scores, expected_round=None):
+        """Commit a round; with `expected_round`, only if the table is still on that round.
+
+        Returns False (and changes nothing) when another session got there first.
+        """
+        return self._act(table_id, _commit_if_current, scores, expected_round)
+
+    def undo(self, table_id):
+        return self._act(table_id, scoring.undo)
+
+    def redo(self, table_id):
+        return self._act(table_id, scoring.redo)
+
+    # Leaderboard
+    def _drop(self, key):
+        entry = self._rows.pop(key, None)
+        if entry is not None:
+            del self._board[bisect_left(self._board, entry)]
+        return entry
+
+    def _update_board(self, table):
+        with table.lock:
+            view = TableView(table)
+        with self._board_lock:
+            if self._versions.get(view.table_id, -1) > view.version:
+                return  # a later change at this table already landed
+            self._versions[view.table_id] = view.version
+            seat = len(view.players)
+            while self._drop((view.table_id, seat)) is not None:
+                seat += 1  # seats dropped by undoing add_player
+            for seat, (player, total) in enumerate(zip(view.players, view.totals)):
+                self._drop((view.table_id, seat))
+                entry = (-total, view.table_id, seat, player, view.name, view.round)
+                insort(self._board, entry)
+                self._rows[(view.table_id, seat)] = entry
+
+    def leaderboard(self, top=LEADERBOARD_SIZE):
+        """[(total, player, table name, round)], best first, across every table."""
+        with self._board_lock:
+            entries = self._board[:top] if top else list(self._board)
+        return [(-neg_total, player, name, round_num) for neg_total, _, _, player, name, round_num in entries]
@@ -0,0 +1,110 @@
+# ---------------------
+# Imports
+# ---------------------
+import numpy as np
+
+from src.core.advisor_logic import (
+    DeckState,
+    NUMBER_KINDS,
+    _batch_score_parts,
+    cards_to_counts,
+    check_bust_batch,
+    compile_rules,
+)
+from src.core.flip_three import flip_three_batch
+
+# ---------------------
+# Targeting
+# ---------------------
+# Drawing `fr` or `f3` means picking who it hits. Every candidate is scored
+# against the same remaining deck in one pass per action:
+#   - Without it, a target is projected to finish the round on their current
+#     score plus whatever their next draw is worth (one-step EV, if positive;
+#     they'd stay otherwise)
+#   - Freeze banks the current score, losing that gain
+#   - Flip 3 replaces the projection with the expected score after three
+#     forced draws
+# Each target's projected total (Scorer total + projected round score) is
+# swapped for the total after the action, and the change is turned into a
+# leaderboard swing: how much your projected lead over the best other player
+# moves.
+TARGET_ACTIONS = ("freeze", "flip_three")
+
+
+def _lead(projected, me):
+    others = [total for name, total in projected.items() if name != me]
+    return projected.get(me, 0.0) - (max(others) if others else 0.0)
+
+
+def rank_targets(hands, deck, totals=None, me="You", rules=None):
+    """Rank every player in `hands` ({name: cards}) as a Freeze and a Flip 3 target.
+
+    `totals` maps names to Scorer totals (missing names count as 0) and hands
+    are scored under `rules` (DEFAULT_RULES if omitted). Returns {action: rows},
+    each row a dict with the target's bust and Flip 7 chances, the change in
+    their projected round score and the leaderboard swing for `me`, best
+    target first.
+    """
+    if not isinstance(deck, DeckState):
+        deck = DeckState.from_cards(deck)
+    totals = totals or {}
+    names = list(hands)
+    if not names:
+        return {action: [] for action in TARGET_ACTIONS}
+
+    # Shared deck: seen = master - hand - deck makes every row's remaining deck exactly `deck`
+    drawn = cards_to_counts([hands[name] for name in names])
+    deck_counts = np.array(deck.counts, dtype=np.int64)
+    seen = compile_rules(rules).master_counts - drawn - deck_counts
+    one_step = check_bust_batch(drawn, seen, rules)
+
+    held, _, unique, _, _, busted, _ = _batch_score_parts(drawn)
+    new_numbers = (deck_counts[: len(NUMBER_KINDS)] * ~held[:, : len(NUMBER_KINDS)]).sum(axis=1)
+    freeze_flip_seven = np.where(~busted & (unique == 6), new_numbers / max(deck.total, 1), 0.0)
+    round_score = one_step["current_score"] + np.maximum(one_step["expected_value"], 0.0)
+
+    flip_three = flip_three_batch([hands[name] for name in names], deck, rules)
+
+    outcomes = {
+        "freeze": {
+            "current_score": one_step["current_score"],
+            "bust_chance": one_step["bust_chance"],
+            "flip_seven_chance": freeze_flip_seven,
+            "round_score": one_step["current_score"],
+        },
+        "flip_three": {
+            "current_score": flip_three["current_score"],
+            "bust_chance": flip_three["bust_chance"],
+            "flip_seven_chance": flip_three["flip_seven_chance"],
+            "round_score": flip_three["expected_score"],
+        },
+    }
+
+    projected = {
+        name: totals.get(name, 0) + float(round_score[i])
+        for i, name in enumerate(names)
+    }
+    base_lead = _lead(projected, me)
+
+    ranked = {}
+    for action, result in outcomes.items():
+        rows = []
+        for i, name in enumerate(names):
+            delta = float(result["round_score"][i] - round_score[i])
+            after = dict(projected)
+            after[name] = totals.get(name, 0) + float(result["round_score"][i])
+            rows.append({
+                "name": name,
+                "current_score": float(result["current_score"][i]),
+                "bust_chance": float(result["bust_chance"][i]),
+                "flip_seven_chance": float(result["flip_seven_chance"][i]),
+                "delta": delta,
+                "swing": _lead(after, me) - base_lead,
+            })
+        # Ties (a target who can't catch the leader) go to whoever it helps you or hurts them most
+        ranked[action] = sorted(
+            rows,
+            key=lambda row: (row["swing"], row["delta"] if row["name"] == me else -row["delta"]),
+            reverse=True,
+        )
+    return ranked
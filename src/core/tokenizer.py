@@ -0,0 +1,85 @@
+# ---------------------
+# Imports
+# ---------------------
+import re
+from functools import lru_cache
+
+from src.core.rules import STANDARD_DECK
+
+# ---------------------
+# Tables
+# ---------------------
+# Aliases for easier typing on iPhone
+CARD_ALIASES = {
+    "-2": "+2",
+    "-4": "+4",
+    "-6": "+6",
+    "-8": "+8",
+    "-10": "+10",
+    "!": "x2",
+    "$": "sc",
+    "&": "fr",
+    "@": "f3",
+}
+VALID_CARDS = frozenset(STANDARD_DECK)  # every card kind
+TOKENIZER_CACHE_SIZE = 4096
+
+_NUMBER_RE = re.compile(r"[-+]?\d*\.?\d+")
+
+
+# ---------------------
+# Tokenizer
+# ---------------------
+def normalize_card(card):
+    return CARD_ALIASES.get(card, card)
+
+
+@lru_cache(maxsize=TOKENIZER_CACHE_SIZE)
+def tokenize(raw):
+    """Split comma-separated card input into normalized tokens.
+
+    Splits on commas (str.split), then strips, lowercases and maps aliases for
+    each piece, dropping empty ones. Returns (tokens, all_valid); the result is
+    LRU-cached on the raw string, so repeated input skips all of that.
+    """
+    tokens = []
+    all_valid = True
+    for piece in raw.split(","):
+        token = piece.strip().lower()
+        if not token:
+            continue
+        token = CARD_ALIASES.get(token, token)
+        if token not in VALID_CARDS:
+            all_valid = False
+        tokens.append(token)
+    return tuple(tokens), all_valid
+
+
+@lru_cache(maxsize=TOKENIZER_CACHE_SIZE)
+def parse_score(raw):
+    """Score a Scorer input box: card tokens if they all look like cards, else plain number(s).
+
+    Returns (tokens, score); tokens is empty when the input was read as numbers.
+    """
+    txt = raw.strip()
+    if txt == "":
+        return (), 0.0
+
+    tokens, all_valid = tokenize(txt)
+    if all_valid:
+        from src.core.advisor_logic import calc_score  # loads the solver module only once cards are scored
+
+        return tokens, float(calc_score(tokens))
+
+    # Fallback: treat as plain number(s)
+    nums = _NUMBER_RE.findall(txt)
+    if nums:
+        if len(nums) == 1:
+            return (), float(nums[0])
+        return (), sum(float(n) for n in nums)
+    return (), 0.0
+
+
+def parse_cards(raw):
+    """Card list for the Advisor inputs (unknown tokens are kept; the deck ignores them)."""
+    return list(tokenize(raw)[0])
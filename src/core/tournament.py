@@ -0,0 +1,129 @@
+# ---------------------
+# Imports
+# ---------------------
+import json
+import math
+import os
+
+from src.core.rules import DEFAULT_RULES
+from src.core.simulator import chunk_seed, map_chunks
+
+# ---------------------
+# Helpers
+# ---------------------
+def wilson_interval(wins, games, z=1.96):
+    """Wilson score interval for a win rate (95% by default)."""
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denom = 1 + z * z / games
+    centre = (p + z * z / (2 * games)) / denom
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _load_checkpoint(path, config):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("config") != config:
+        raise ValueError(f"Checkpoint {path} was written for a different tournament configuration")
+    return checkpoint
+
+
+def _write_checkpoint(path, checkpoint):
+    # Write-then-rename so an interrupted run never leaves a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+# ---------------------
+# Tournament
+# ---------------------
+def run_tournament(
+    policies,
+    n_games,
+    seed=0,
+    workers=None,
+    chunk_size=500,
+    target=None,
+    rules=None,
+    checkpoint_path=None,
+    checkpoint_every=10,
+):
+    """Race `policies` ({name: policy}) against each other at one table over `n_games` seeded games.
+
+    Games follow `rules` (DEFAULT_RULES if omitted) and end at `target` (the
+    ruleset's target score unless given). Seats rotate from chunk to chunk so
+    no policy keeps the first-player edge.
+    With `checkpoint_path`, finished chunks are saved as they complete and a
+    rerun with the same arguments resumes from where it stopped. Returns
+    {name: {"wins", "games", "win_rate", "ci_low", "ci_high", "avg_final_score"}}.
+    """
+    rules = rules or DEFAULT_RULES
+    target = target or rules.target_score
+    names = list(policies)
+    k = len(names)
+    config = {
+        "policies": [[name, repr(policies[name])] for name in names],
+        "n_games": n_games,
+        "seed": seed,
+        "chunk_size": chunk_size,
+        "target": target,
+        "rules": repr(rules),
+    }
+
+    checkpoint = _load_checkpoint(checkpoint_path, config) or {
+        "config": config,
+        "done": [],
+        "games": 0,
+        "wins": {name: 0 for name in names},
+        "final_scores": {name: 0 for name in names},
+    }
+    done = set(checkpoint["done"])
+
+    # Chunk i seats policy (seat + i) % k in each seat
+    seatings = {}
+    chunks = []
+    for i, start in enumerate(range(0, n_games, chunk_size)):
+        if i in done:
+            continue
+        seating = [names[(seat + i) % k] for seat in range(k)]
+        seatings[len(chunks)] = (i, seating)
+        chunks.append(([policies[name] for name in seating], min(chunk_size, n_games - start), chunk_seed(seed, i), target, rules))
+
+    since_save = 0
+    try:
+        for j, stats in map_chunks(chunks, workers):
+            i, seating = seatings[j]
+            checkpoint["games"] += stats.games
+            for seat, name in enumerate(seating):
+                checkpoint["wins"][name] += stats.wins[seat]
+                checkpoint["final_scores"][name] += stats.final_scores[seat]
+            checkpoint["done"].append(i)
+            since_save += 1
+            if checkpoint_path and since_save >= checkpoint_every:
+                _write_checkpoint(checkpoint_path, checkpoint)
+                since_save = 0
+    finally:
+        # Also runs on Ctrl-C, so everything finished so far is kept
+        if checkpoint_path:
+            _write_checkpoint(checkpoint_path, checkpoint)
+
+    games = checkpoint["games"]
+    results = {}
+    for name in names:
+        wins = checkpoint["wins"][name]
+        low, high = wilson_interval(wins, games)
+        results[name] = {
+            "wins": wins,
+            "games": games,
+            "win_rate": wins / games if games else 0.0,
+            "ci_low": low,
+            "ci_high": high,
+            "avg_final_score": checkpoint["final_scores"][name] / games if games else 0.0,
+        }
+    return results
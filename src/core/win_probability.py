@@ -0,0 +1,120 @@
+# ---------------------
+# Imports
+# ---------------------
+import numpy as np
+
+from src.core.advisor_logic import build_master_deck_state, calc_score, final_score_distribution
+from src.core.rules import DEFAULT_RULES
+
+# ---------------------
+# Constants
+# ---------------------
+MAX_ROUNDS = 60  # horizon; games this long are vanishingly rare
+END_TOLERANCE = 1e-9  # stop once the chance the game is still running drops below this
+
+_fresh_round_pmfs = {}  # ruleset -> PMF
+
+
+# ---------------------
+# Round Distributions
+# ---------------------
+def fresh_round_pmf(rules=None):
+    """Round score PMF for a player starting from an empty hand and a full deck, playing optimally."""
+    rules = rules or DEFAULT_RULES
+    pmf = _fresh_round_pmfs.get(rules)
+    if pmf is None:
+        pmf = final_score_distribution([], build_master_deck_state(rules), rules=rules)["pmf"]
+        _fresh_round_pmfs[rules] = pmf
+    return pmf
+
+
+def stay_pmf(score):
+    pmf = np.zeros(int(score) + 1)
+    pmf[int(score)] = 1.0
+    return pmf
+
+
+# ---------------------
+# Win Probability
+# ---------------------
+def win_probabilities(totals, round_pmfs, target=None, future_pmf=None, rules=None):
+    """Probability each player wins the game from `totals` under `rules` (DEFAULT_RULES if omitted).
+
+    `round_pmfs[i]` is player i's score PMF for the current round (None for a
+    fresh round); later rounds use `future_pmf` (default fresh_round_pmf()).
+    `target` defaults to the ruleset's target score.
+    Players are independent, so each keeps its own total distribution, advanced
+    one round at a time by convolution. In the round where someone first
+    reaches `target`, player i wins when their total beats everyone else's
+    (ties, which the real game plays out, are shared out proportionally).
+    """
+    rules = rules or DEFAULT_RULES
+    target = target or rules.target_score
+    n = len(totals)
+    if max(totals) >= target:
+        # Game already decided
+        wins = np.array([float(t == max(totals)) for t in totals])
+        return wins / wins.sum()
+
+    future_pmf = fresh_round_pmf(rules) if future_pmf is None else future_pmf
+    size = target + len(future_pmf) + max((len(p) for p in round_pmfs if p is not None), default=0)
+
+    # alive[j][t]: P(player j has total t and has not reached target yet); start of round 1
+    alive = []
+    for total in totals:
+        dist = np.zeros(size)
+        dist[min(int(total), size - 1)] = 1.0
+        alive.append(dist)
+
+    wins = np.zeros(n)
+    for round_idx in range(MAX_ROUNDS):
+        # Totals after this round, for games still running
+        after = []
+        for j in range(n):
+            pmf = round_pmfs[j] if round_idx == 0 and round_pmfs[j] is not None else future_pmf
+            conv = np.convolve(alive[j][:target], pmf)
+            step = np.zeros(size)
+            step[: min(len(conv), size)] = conv[:size]
+            step[size - 1] += conv[size:].sum()  # clip overflow into the last bin
+            after.append(step)
+
+        # P(player j's total after this round < t), for every t
+        below = [np.concatenate(([0.0], np.cumsum(a)[:-1])) for a in after]
+        log_below = np.log(np.stack(below) + 1e-300)
+        all_below = log_below.sum(axis=0)
+
+        for i in range(n):
+            others = np.exp(all_below - log_below[i])
+            wins[i] += after[i][target:] @ others[target:]
+
+        alive = [np.concatenate((a[:target], np.zeros(size - target))) for a in after]
+        running = np.prod([a.sum() for a in alive])
+        if running < END_TOLERANCE:
+            break
+
+    total = wins.sum()
+    return wins / total if total > 0 else np.full(n, 1.0 / n)
+
+
+def hit_or_stay(player, totals, drawn, deck, round_pmfs=None, target=None, rules=None):
+    """Whether hitting or staying gives `player` the better chance to win the game.
+
+    `round_pmfs` holds everyone else's current-round PMFs (None = fresh round);
+    the entry for `player` is replaced by their STAY and HIT distributions.
+    `target` and `rules` are as in win_probabilities.
+    """
+    round_pmfs = list(round_pmfs) if round_pmfs is not None else [None] * len(totals)
+    drawn = [str(item) for item in drawn]
+
+    round_pmfs[player] = stay_pmf(calc_score(drawn, rules))
+    stay = win_probabilities(totals, round_pmfs, target, rules=rules)
+    round_pmfs[player] = final_score_distribution(drawn, deck, force_hit=True, rules=rules)["pmf"]
+    hit = win_probabilities(totals, round_pmfs, target, rules=rules)
+
+    return {
+        "recommendation": "HIT" if hit[player] > stay[player] else "STAY",
+        "stay_win": float(stay[player]),
+        "hit_win": float(hit[player]),
+        "stay_all": stay,
+        "hit_all": hit,
+    }
@@ -1,3 +1,10 @@
-from . import scorer, advisor
+import importlib
 
-__all__ = ["scorer", "advisor"]
\ No newline at end of file
+__all__ = ["scorer", "advisor", "tables", "perf"]
+
+
+def __getattr__(name):
+    # Lazy so importing one page does not import the other
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,172 @@
 # ---------------------
 # Imports
 # ---------------------
+import uuid
+from concurrent.futures import CancelledError, Future
+
 import streamlit as st
-from src.core import advisor_logic
-from src.core.legend import normalize_card, render_legend
+from src.core import cache, scoring
+from src.core.advisor_logic import DeckState
+from src.core.deck_tracker import DeckTracker
+from src.core.legend import render_legend
+from src.core.tokenizer import parse_cards
 
 # ---------------------
 # Helper Functions
 # ---------------------
+STAY_RULES = {"Optimal": "optimal", **{f"Stay at {n}": n for n in range(15, 55, 5)}}
+TARGET_ACTIONS = {"Freeze": "freeze", "Flip 3": "flip_three"}
+POLL_SECONDS = 0.5  # how often pending results are checked while analyses run
+
+
 def parse_card_input(input_str):
-    if not input_str.strip():
-        return []
+    return parse_cards(input_str)  # Normalizes aliases and filters empty
+
+
+def parse_opponent_input(input_str):
+    # One opponent per line: "Name: 3, 7, +4" (name optional)
+    opponents = {}
+    for i, line in enumerate(input_str.splitlines()):
+        if not line.strip():
+            continue
+        name, sep, cards = line.partition(":")
+        if not sep:
+            name, cards = f"Opponent {i+1}", line
+        opponents[name.strip() or f"Opponent {i+1}"] = parse_card_input(cards)
+    return opponents
 
-    cards = [card.strip().lower() for card in input_str.split(",")]
-    cards = [normalize_card(card) for card in cards if card]  # Normalize aliases and filter empty
+
+def get_deck_tracker():
+    # One tracker per session; it outlives rounds so discards carry over
+    if "deck_tracker" not in st.session_state:
+        st.session_state.deck_tracker = DeckTracker()
+    return st.session_state.deck_tracker
+
+
+def round_cards(drawn_input, seen_input, opponents_input):
+    cards = parse_card_input(drawn_input) + parse_card_input(seen_input)
+    for opponent_cards in parse_opponent_input(opponents_input).values():
+        cards += opponent_cards
     return cards
 
+
+def sync_deck_tracker():
+    # on_change callback: apply only the cards that changed in the inputs; results for the old inputs are stale
+    cancel_analysis()
+    get_deck_tracker().sync(round_cards(
+        st.session_state.get("drawn_text_input", ""),
+        st.session_state.get("seen_text_input", ""),
+        st.session_state.get("opponents_text_input", ""),
+    ))
+
+def clear_inputs():
+    # Button callbacks run before the widgets are rebuilt, so their keys can be reset here
+    cancel_analysis()
+    for key in ["drawn_input", "seen_input", "opponents_input", "drawn_text_input", "seen_text_input", "opponents_text_input"]:
+        st.session_state[key] = ""
+    get_deck_tracker().sync([])
+
+
+def end_round():
+    # This round's cards move to the discard pile, then the inputs start fresh
+    sync_deck_tracker()
+    get_deck_tracker().end_round()
+    clear_inputs()
+
+# ---------------------
+# Background Analyses
+# ---------------------
+# The one-step advice is cheap and rendered straight away; the lookahead, targeting,
+# distribution and win-probability analyses run on the shared job executor and
+# fill in as they finish. Jobs are keyed on their inputs, so sessions asking the
+# same question share one computation.
+def _job_owner():
+    if "job_owner" not in st.session_state:
+        st.session_state.job_owner = uuid.uuid4().hex
+    return st.session_state.job_owner
+
+
+def start_analysis(request):
+    cancel_analysis()
+    executor = cache.get_job_executor()
+    owner = _job_owner()
+    drawn, deck_key = request["drawn"], request["deck_key"]
+    drawn_key = tuple(sorted(drawn))
+    stay_rule = STAY_RULES[request["stay_rule"]]
+
+    specs = {
+        "lookahead": (("lookahead", drawn_key, deck_key), cache.get_lookahead, drawn),
+        "distribution": (("distribution", drawn_key, deck_key, stay_rule), cache.get_score_distribution, drawn),
+    }
+    jobs = {}
+    # States in the precomputed table skip the queue entirely
+    instant = cache.get_table_lookahead(drawn, DeckState(deck_key))
+    if instant is not None:
+        done = Future()
+        done.set_result(instant)
+        jobs["lookahead"] = (specs.pop("lookahead")[0], done)
+    for name, (key, fn, first) in specs.items():
+        extra = (stay_rule,) if name == "distribution" else ()
+        jobs[name] = (key, executor.submit(key, owner, fn, first, DeckState(deck_key), *extra))
+
+    hands = {"You": drawn, **request["opponents"]}
+    totals = request["target_totals"]
+    key = (
+        "targeting",
+        tuple((name, tuple(sorted(cards))) for name, cards in hands.items()),
+        deck_key,
+        tuple(sorted(totals.items())),
+    )
+    jobs["targeting"] = (key, executor.submit(key, owner, cache.get_targeting, hands, DeckState(deck_key), totals))
+    if request["win"] is not None:
+        totals, player, opponent_hands = request["win"]
+        key = ("win", tuple(totals), player, drawn_key, deck_key, tuple(sorted(opponent_hands.items())))
+        jobs["win"] = (key, executor.submit(
+            key, owner, cache.get_win_probability, totals, player, drawn, DeckState(deck_key), opponent_hands
+        ))
+
+    st.session_state.advisor_request = request
+    st.session_state.advisor_jobs = jobs
+    st.session_state.advisor_errors = {}
+
+
+def cancel_analysis():
+    # Inputs changed: drop this session's claim on its jobs (unstarted ones nobody else wants are cancelled)
+    jobs = st.session_state.get("advisor_jobs") or {}
+    if jobs:
+        executor = cache.get_job_executor()
+        for key, _ in jobs.values():
+            executor.release(key, _job_owner())
+    st.session_state.advisor_jobs = {}
+    st.session_state.advisor_errors = {}
+    st.session_state.advisor_request = None
+
+
+def job_result(name):
+    """Finished result of this session's job `name`, or None while it is still running or if it failed.
+
+    A failed or cancelled job is dropped and its message kept for show_pending(), so
+    one broken analysis doesn't take the rest of the page down with it.
+    """
+    jobs = st.session_state.get("advisor_jobs", {})
+    entry = jobs.get(name)
+    if entry is None or not entry[1].done():
+        return None
+    try:
+        return entry[1].result()
+    except CancelledError:
+        error = "it was cancelled. Press Advise to run it again."
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    del jobs[name]
+    st.session_state.setdefault("advisor_errors", {})[name] = error
+    return None
+
+
+def pending_jobs():
+    return [name for name, (_, future) in st.session_state.get("advisor_jobs", {}).items() if not future.done()]
+
+
 # ---------------------
 # Page
 # ---------------------
@@ -28,12 +179,14 @@ def show():
         render_legend()
 
     st.title("Tofu's Flip Seven Advisor")
-    st.write("NOTE: F3 calculator not yet implemented; doesnt account for you having Second Chance.")
     st.markdown("---")
 
     # Input fields
     st.markdown("### Enter Your Cards")
-    st.caption("Enter cards as comma-separated values (e.g., 2, 10, 8, 3, sc)")
+    st.caption(
+        "Enter cards as comma-separated values (e.g., 2, 10, 8, 3, sc). Include `sc` while you hold "
+        "Second Chance; once it saves you, enter the repeat too (or drop both)."
+    )
 
     # Initialize session state for inputs if not present
     if "drawn_input" not in st.session_state:
@@ -45,109 +198,295 @@ def show():
         "**Drawn** (Your Cards):",
         value=st.session_state.drawn_input,
         placeholder="e.g., 2, 10, 1, 3, 8",
-        key="drawn_text_input"
+        key="drawn_text_input",
+        on_change=sync_deck_tracker,
     )
 
     seen_input = st.text_input(
         "**Seen** (Other People's Cards):",
         value=st.session_state.seen_input,
         placeholder="e.g., 11, 12, x2, sc",
-        key="seen_text_input"
+        key="seen_text_input",
+        on_change=sync_deck_tracker,
+    )
+
+    if "opponents_input" not in st.session_state:
+        st.session_state.opponents_input = ""
+
+    opponents_input = st.text_area(
+        "**Opponents** (Optional, for Freeze / Flip 3 targets; one per line, don't repeat these in Seen):",
+        value=st.session_state.opponents_input,
+        placeholder="e.g., Bryan: 3, 7, +4",
+        key="opponents_text_input",
+        on_change=sync_deck_tracker,
     )
 
+    stay_rule_label = st.selectbox(
+        "Stay rule for the final score distribution:",
+        list(STAY_RULES),
+        key="stay_rule_select",
+        on_change=cancel_analysis,
+    )
+
+    # Win probability needs the Scorer's totals, so only offer it once a game is running
+    players = list(st.session_state.get("players", [])) if st.session_state.get("game_started") else []
+    me = None
+    if players:
+        me = st.selectbox("You are (Scorer player):", players, key="me_select", on_change=cancel_analysis)
+
     # Update session state
     st.session_state.drawn_input = drawn_input
     st.session_state.seen_input = seen_input
+    st.session_state.opponents_input = opponents_input
+
+    tracker = get_deck_tracker()
 
     # Buttons
-    col_advise, col_clear = st.columns(2)
+    col_advise, col_end_round, col_clear, col_reset = st.columns(4)
 
     with col_advise:
         advise_clicked = st.button("Advise", type="primary", use_container_width=True)
 
+    with col_end_round:
+        st.button("End Round", use_container_width=True, on_click=end_round)
+
     with col_clear:
-        clear_clicked = st.button("Clear", use_container_width=True)
+        st.button("Clear", use_container_width=True, on_click=clear_inputs)
 
-    # Handle Clear button
-    if clear_clicked:
-        st.session_state.drawn_input = ""
-        st.session_state.seen_input = ""
+    with col_reset:
+        reset_clicked = st.button("Reset Deck", use_container_width=True)
+
+    st.caption(
+        f"Deck: {tracker.deck.total} cards left | {tracker.discarded.total} in discard | "
+        f"reshuffles: {tracker.reshuffles}"
+    )
+
+    # Handle Reset Deck button: new game or a manual reshuffle
+    if reset_clicked:
+        cancel_analysis()
+        tracker.reset()
+        tracker.sync(round_cards(drawn_input, seen_input, opponents_input))
         st.rerun()
 
     # Handle Advise button
     if advise_clicked:
         # Parse inputs
         drawn_cards = parse_card_input(drawn_input)
-        seen_cards = parse_card_input(seen_input)
+        opponents = parse_opponent_input(opponents_input)
 
         if not drawn_cards:
             st.warning("Please enter at least one card in your hand.")
             return
 
-        # Build deck and remove cards
-        deck = advisor_logic.build_master_deck()
-        deck = advisor_logic.pop_from_deck(drawn_cards, deck)
-        deck = advisor_logic.pop_from_deck(seen_cards, deck)
+        # Read the tracked deck (a no-op sync unless an input skipped its callback)
+        tracker.sync(round_cards(drawn_input, seen_input, opponents_input))
 
-        # Get advice
-        advice = advisor_logic.check_bust(drawn_cards, deck)
+        # Scorer totals for the targeting swing; opponents match by Scorer name, you by "You are"
+        totals = scoring.current_totals() if players else []
+        target_totals = {name: totals[players.index(name)] for name in opponents if name in players}
+        if me is not None:
+            target_totals["You"] = totals[players.index(me)]
+
+        win = None
+        if me is not None:
+            player = players.index(me)
+            opponent_hands = {
+                players.index(name): tuple(sorted(cards))
+                for name, cards in opponents.items()
+                if name in players and name != me
+            }
+            win = (scoring.current_totals(), player, opponent_hands)
+
+        start_analysis({
+            "drawn": drawn_cards,
+            "opponents": opponents,
+            "deck_key": tracker.deck.key(),
+            "stay_rule": stay_rule_label,
+            "target_totals": target_totals,
+            "win": win,
+            "players": players,
+        })
+
+    # Results stay up until the inputs change; the slow parts poll in a fragment while they run
+    request = st.session_state.get("advisor_request")
+    if request:
+        if pending_jobs():
+            st.fragment(run_every=POLL_SECONDS)(show_results)(request, polling=True)
+        else:
+            show_results(request)
 
-        # Display results
-        st.markdown("---")
-        st.markdown("### Advice Results")
 
-        # Main recommendation
-        rec_color = "green" if advice["recommendation"] == "HIT" else "red"
-        st.markdown(
-            f"<h2 style='color: {rec_color};'>{advice['recommendation']}</h2>",
-            unsafe_allow_html=True
+def show_pending(name, label):
+    error = st.session_state.get("advisor_errors", {}).get(name)
+    if error is not None:
+        st.warning(f"Couldn't compute {label}: {error}")
+    else:
+        st.caption(f"*Computing {label}…*")
+
+
+def show_results(request, polling=False):
+    drawn_cards = request["drawn"]
+    deck = DeckState(request["deck_key"])
+
+    # Cheap one-step advice, shown while the deeper analyses run
+    advice = cache.get_advice(drawn_cards, deck)
+
+    # Display results
+    st.markdown("---")
+    st.markdown("### Advice Results")
+
+    pending = pending_jobs()
+    total_jobs = len(st.session_state.advisor_jobs)
+    if pending:
+        st.progress(
+            (total_jobs - len(pending)) / total_jobs,
+            text=f"Deeper analysis: {total_jobs - len(pending)}/{total_jobs} done (showing one-step EV meanwhile)",
         )
 
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            st.metric("Current Score", f"{advice['current_score']}")
-
-            # Expected values breakdown
-            st.markdown("#### Expected Values by Card")
-            ev_text = ""
-            for card, perc, total, delta, ev in advice["expected_values_data"]:
-                tag = f"+{delta}" if delta > 0 else str(delta)
-                ev_text += f"`{card:>3}` ({perc*100:5.2f}%) → {total:>3} ({tag:>4}) | EV: {ev:>6.2f}\n\n"
-            st.markdown(ev_text)
-
-        with col2:
-            st.metric("Expected Value", f"{advice['expected_value']:.2f}")
-
-            # Bust chance
-            st.markdown(f"#### Bust Chance: {advice['bust_chance']*100:.2f}%")
-            if advice["bustable"]:
-                bust_text = ""
-                for card, perc in advice["bustable"]:
-                    bust_text += f"`{card:>3}` ({perc*100:5.2f}%)\n\n"
-                st.markdown(bust_text)
-            else:
-                st.markdown("*No bust cards remaining*")
-
-        with col3:
-            # Display unique numbers with special styling if flip seven achieved
-            unique_label = "Numbers Until Flip7"
-            unique_value = f"{advice['unique_numbers']}/7"
-            if advice['has_flip_seven']:
-                st.markdown(
-                    f"**{unique_label}**  \n"
-                    f"<span style='color: gold; font-size: 24px;'>✨ {unique_value} ✨</span>",
-                    unsafe_allow_html=True
-                )
-            else:
-                st.metric(unique_label, unique_value)
-
-            # Events chance
-            st.markdown(f"#### Event Chance: {advice['event_chance']*100:.2f}%")
-            if advice["events"]:
-                event_text = ""
-                for card, perc in advice["events"]:
-                    event_text += f"`{card:>3}` ({perc*100:5.2f}%)\n\n"
-                st.markdown(event_text)
-            else:
-                st.markdown("*No event cards remaining*")
\ No newline at end of file
+    # Main recommendation
+    rec_color = "green" if advice["recommendation"] == "HIT" else "red"
+    st.markdown(
+        f"<h2 style='color: {rec_color};'>{advice['recommendation']}</h2>",
+        unsafe_allow_html=True
+    )
+
+    optimal = job_result("lookahead")
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Current Score", f"{advice['current_score']}")
+
+        # Expected values breakdown
+        st.markdown("#### Expected Values by Card")
+        ev_text = ""
+        for card, perc, total, delta, ev in advice["expected_values_data"]:
+            tag = f"+{delta}" if delta > 0 else str(delta)
+            ev_text += f"`{card:>3}` ({perc*100:5.2f}%) → {total:>3} ({tag:>4}) | EV: {ev:>6.2f}\n\n"
+        st.markdown(ev_text)
+
+        # Lookahead plan for the next card
+        st.markdown("#### Lookahead Plan")
+        if optimal is None:
+            show_pending("lookahead", "the lookahead plan")
+        else:
+            plan_text = ""
+            for card, perc, value, action in optimal["next_card_policy"]:
+                plan_text += f"`{card:>3}` ({perc*100:5.2f}%) → {value:6.2f} | then {action}\n\n"
+            st.markdown(plan_text)
+
+    with col2:
+        st.metric("Expected Value", f"{advice['expected_value']:.2f}")
+        if optimal is None:
+            show_pending("lookahead", "lookahead")
+        else:
+            st.metric(
+                f"Lookahead: {optimal['recommendation']}",
+                f"{optimal['value']:.2f}",
+                help="Expected final round score playing optimally from here (multi-draw), vs. one-step EV above.",
+            )
+
+        # Bust chance
+        st.markdown(f"#### Bust Chance: {advice['bust_chance']*100:.2f}%")
+        if advice["bustable"]:
+            bust_text = ""
+            for card, perc in advice["bustable"]:
+                bust_text += f"`{card:>3}` ({perc*100:5.2f}%)\n\n"
+            st.markdown(bust_text)
+        elif advice["has_second_chance"]:
+            st.markdown("*Second Chance held: a repeat is discarded with it instead*")
+        else:
+            st.markdown("*No bust cards remaining*")
+
+    with col3:
+        # Display unique numbers with special styling if flip seven achieved
+        unique_label = "Numbers Until Flip7"
+        unique_value = f"{advice['unique_numbers']}/7"
+        if advice['has_flip_seven']:
+            st.markdown(
+                f"**{unique_label}**  \n"
+                f"<span style='color: gold; font-size: 24px;'>✨ {unique_value} ✨</span>",
+                unsafe_allow_html=True
+            )
+        else:
+            st.metric(unique_label, unique_value)
+
+        # Events chance
+        st.markdown(f"#### Event Chance: {advice['event_chance']*100:.2f}%")
+        if advice["events"]:
+            event_text = ""
+            for card, perc in advice["events"]:
+                event_text += f"`{card:>3}` ({perc*100:5.2f}%)\n\n"
+            st.markdown(event_text)
+        else:
+            st.markdown("*No event cards remaining*")
+
+    # Freeze / Flip 3: every entered hand as a target
+    st.markdown("---")
+    st.markdown("### Freeze / Flip 3 Targets")
+    st.caption(
+        "Swing: how much your projected lead over the best other player moves (Scorer totals + this round). "
+        "Flip 3 sets aside a drawn `f3`/`fr` for the target to play afterwards."
+    )
+    ranking = job_result("targeting")
+    if ranking is None:
+        show_pending("targeting", "target rankings")
+    else:
+        # Every candidate is already ranked, so these only pick what to read from the result
+        action_label = st.radio("Action", list(TARGET_ACTIONS), horizontal=True, key="target_action")
+        rows = ranking[TARGET_ACTIONS[action_label]]
+        names = [row["name"] for row in rows]
+        target = st.selectbox("Target", names, key="target_select")
+        row = rows[names.index(target)]
+
+        metric_cols = st.columns(4)
+        metric_cols[0].metric("Swing", f"{row['swing']:+.2f}")
+        metric_cols[1].metric("Their score change", f"{row['delta']:+.2f}")
+        metric_cols[2].metric("Bust", f"{row['bust_chance']*100:.1f}%")
+        metric_cols[3].metric("Flip 7", f"{row['flip_seven_chance']*100:.1f}%")
+
+        target_text = ""
+        for rank, row in enumerate(rows, start=1):
+            target_text += (
+                f"{rank}. **{row['name']}**: swing {row['swing']:+.2f} | bust {row['bust_chance']*100:5.2f}% | "
+                f"Flip7 {row['flip_seven_chance']*100:5.2f}% | score {row['current_score']:.0f} ({row['delta']:+.2f})\n\n"
+            )
+        st.markdown(target_text)
+
+    # Where this hand ends up under the chosen stay rule
+    st.markdown("---")
+    st.markdown(f"### Final Score Distribution ({request['stay_rule']})")
+    distribution = job_result("distribution")
+    if distribution is None:
+        show_pending("distribution", "the distribution")
+    else:
+        st.caption(
+            f"Expected {distribution['expected_score']:.2f} | "
+            f"bust {distribution['bust_chance']*100:.2f}% (counted at 0)"
+        )
+        st.bar_chart({"probability": distribution["pmf"]})  # x = final round score
+
+    # Hit or stay for the game, not just the round
+    if request["win"] is not None:
+        st.markdown("---")
+        st.markdown("### Win Probability")
+        win = job_result("win")
+        if win is None:
+            show_pending("win", "win probabilities")
+        else:
+            rec_color = "green" if win["recommendation"] == "HIT" else "red"
+            st.markdown(
+                f"To win the game: <b style='color: {rec_color};'>{win['recommendation']}</b> "
+                f"(stay {win['stay_win']*100:.1f}% vs. hit {win['hit_win']*100:.1f}%)",
+                unsafe_allow_html=True,
+            )
+            st.caption(
+                "Opponents entered under their Scorer name play out their hand; everyone else starts a fresh round."
+            )
+            win_text = ""
+            for name, stay_p, hit_p in zip(request["players"], win["stay_all"], win["hit_all"]):
+                win_text += f"**{name}**: if you stay {stay_p*100:5.1f}% | if you hit {hit_p*100:5.1f}%\n\n"
+            st.markdown(win_text)
+
+    # Everything landed: one full rerun drops the polling fragment
+    if polling and not pending:
+        st.rerun()
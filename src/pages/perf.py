@@ -0,0 +1,62 @@
+# ---------------------
+# Imports
+# ---------------------
+import streamlit as st
+from src.core import cache, perf
+
+# ---------------------
+# Helper Functions
+# ---------------------
+def render_stats(stats):
+    if not stats:
+        st.markdown("*Nothing recorded yet*")
+        return
+    text = "| Name | Calls | Mean (us) | p50 (us) | p95 (us) | Max (us) |\n|---|---|---|---|---|---|\n"
+    for name, s in stats.items():
+        text += (
+            f"| `{name}` | {s['calls']} | {s['mean_us']:.1f} | ≤{s['p50_us']:.0f} | "
+            f"≤{s['p95_us']:.0f} | {s['max_us']:.1f} |\n"
+        )
+    st.markdown(text)
+
+
+def render_cache_stats(stats):
+    text = "| Cache | Hits | Misses |\n|---|---|---|\n"
+    for name, s in stats.items():
+        text += f"| `{name}` | {s['hits']} | {s['misses']} |\n"
+    st.markdown(text)
+
+# ---------------------
+# Page
+# ---------------------
+def show():
+    st.title("Perf")
+    st.caption("Hot-path timings recorded while instrumentation is on (open with `?perf=1`).")
+
+    enabled = st.toggle("Instrumentation enabled", value=perf.ENABLED)
+    if enabled != perf.ENABLED:
+        perf.enable(enabled)
+
+    col_reset, col_export = st.columns(2)
+    with col_reset:
+        if st.button("Reset", use_container_width=True):
+            perf.reset()
+            st.rerun()
+    with col_export:
+        st.download_button(
+            "Export JSON",
+            data=perf.export_json(),
+            file_name="flip7_perf.json",
+            mime="application/json",
+            use_container_width=True,
+        )
+
+    st.markdown("### This Session")
+    render_stats(perf.snapshot(perf.current_session_id()))
+
+    st.markdown("### All Sessions")
+    render_stats(perf.snapshot())
+
+    st.markdown("### Caches")
+    st.caption("Hits and misses per cache, across every session in this process.")
+    render_cache_stats(cache.cache_stats())
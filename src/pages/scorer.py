@@ -2,12 +2,52 @@
 # Imports
 # ---------------------
 import streamlit as st
-import pandas as pd
-import matplotlib
 import src.core.scoring as scoring
+from src.core import cache, perf
 import src.core.default_fields as default
+from src.core.rules import DEFAULT_RULES
 from src.core.legend import render_legend
 
+# ---------------------
+# Callbacks
+# ---------------------
+def undo_action():
+    # Undoing a round puts its scores back in the inputs so they can be fixed and re-committed
+    action = scoring.undo()
+    if action is not None and action[0] == "round":
+        round_num = st.session_state.round
+        inputs = [f"{score:g}" for score in action[1][: len(st.session_state.players)]]
+        for i, value in enumerate(inputs):
+            st.session_state[f"round_input_{round_num}_{i}"] = value
+        st.session_state.current_round_inputs = inputs
+
+
+def redo_action():
+    scoring.redo()
+
+
+def edit_past_score():
+    if not st.session_state.edit_value.strip():
+        return
+    round_idx = st.session_state.edit_round - 1
+    player = st.session_state.players.index(st.session_state.edit_player)
+    scoring.edit_score(round_idx, player, scoring.parse_score_input(st.session_state.edit_value))
+    st.session_state.edit_value = ""
+
+
+def add_player_to_game():
+    name = st.session_state.new_player_name.strip()
+    if name:
+        scoring.add_player(name)
+    st.session_state.new_player_name = ""
+
+
+def show_undo_redo():
+    undo_col, redo_col = st.columns(2)
+    undo_col.button("Undo ↩️", use_container_width=True, on_click=undo_action, disabled=not scoring.can_undo())
+    redo_col.button("Redo ↪️", use_container_width=True, on_click=redo_action, disabled=not scoring.can_redo())
+
+
 # ---------------------
 # Page
 # ---------------------
@@ -20,7 +60,16 @@ def show():
         render_legend()
 
     st.title("Tofu's Flip Seven Scorer")
-    scoring.initialize_session_state()
+    # ?game=<id> in the URL resumes a saved game after a restart or a lost tab
+    store = cache.get_game_store()
+    scoring.initialize_session_state(
+        store=store, game_id=st.query_params.get("game"), writer=perf.current_session_id()
+    )
+    if st.session_state.pop("forked_from", None) is not None:
+        st.query_params["game"] = st.session_state.game_id
+        st.info("This game is open in another tab, so this tab carries on with its own copy (the link now points to it).")
+    if store.last_error is not None:
+        st.warning(f"Scores aren't being saved: {store.last_error}")
 
     if not st.session_state.game_started:
         show_player_setup()
@@ -100,15 +149,16 @@ def show_player_setup():
 
             # Start if at least one non-empty name provided
             if names:
-                st.session_state.players = names
-                st.session_state.history = []
-                st.session_state.round = 1
-                st.session_state.current_round_inputs = ["" for _ in st.session_state.players]
-                st.session_state.game_started = True
+                scoring.start_game(names)
+                st.query_params["game"] = st.session_state.game_id  # bookmarkable resume link
                 st.rerun()
             else:
                 st.warning("Please add at least one player name before starting the game.")
 
+    # A Restart can still be taken back from here
+    if scoring.can_undo():
+        show_undo_redo()
+
 
 def show_game_table():
     players = st.session_state.players
@@ -118,8 +168,6 @@ def show_game_table():
     if "current_round_inputs" not in st.session_state or len(st.session_state.current_round_inputs) != n:
         st.session_state.current_round_inputs = ["" for _ in players]
 
-    from src.core.scoring import parse_score_input
-
     # Callback to clear a single player's input
     def clear_input(idx):
         round_num = st.session_state.round
@@ -151,7 +199,7 @@ def show_game_table():
 
         # Total Score: "120 (80)"
         total = totals[i]
-        left = max(0, 200 - total)
+        left = max(0, DEFAULT_RULES.target_score - total)
         row[1].markdown(f"{total:.0f} ({left:.0f})")
 
         # Round input
@@ -166,7 +214,7 @@ def show_game_table():
         st.session_state.current_round_inputs[i] = raw
 
         # Running Total: "+34 (154)" coloured
-        parsed = parse_score_input(raw)
+        parsed = scoring.parse_score_input(raw)
         projected = total + parsed
         if parsed > 0:
             color = "green"
@@ -186,7 +234,7 @@ def show_game_table():
     btn_left, btn_right = st.columns(2)
     with btn_left:
         if st.button("Next Round ➕", type="primary", use_container_width=True):
-            parsed_list = [parse_score_input(st.session_state.current_round_inputs[j]) for j in range(n)]
+            parsed_list = [scoring.parse_score_input(st.session_state.current_round_inputs[j]) for j in range(n)]
             scoring.commit_round(parsed_list)
             # Clear current inputs so next round starts fresh
             st.session_state.current_round_inputs = ["" for _ in players]
@@ -195,6 +243,20 @@ def show_game_table():
         if st.button("Restart 🔄", use_container_width=True):
             scoring.restart_game()
             st.rerun()
+    show_undo_redo()
+
+    # Fix a past round or add a late player without restarting
+    with st.expander("Edit scores / add player"):
+        rounds = len(scoring.get_history(st.session_state))
+        if rounds:
+            edit_cols = st.columns([2, 1, 2, 1])
+            edit_cols[0].selectbox("Player", players, key="edit_player")
+            edit_cols[1].number_input("Round", min_value=1, max_value=rounds, value=rounds, key="edit_round")
+            edit_cols[2].text_input("New score", key="edit_value", placeholder="e.g. 42 or 3, 5, x2")
+            edit_cols[3].button("Save", on_click=edit_past_score, use_container_width=True)
+        add_cols = st.columns([5, 1])
+        add_cols[0].text_input("New player", key="new_player_name")
+        add_cols[1].button("Add", on_click=add_player_to_game, use_container_width=True)
 
     # Combined scores & totals table
     st.markdown("---")
@@ -203,29 +265,7 @@ def show_game_table():
     # Recompute totals after any possible round commit above
     totals = scoring.current_totals()
 
-    # Build history frame: rows=players, cols=R1..Rn; fill missing with 0
-    rounds = len(st.session_state.history)
-    if rounds > 0:
-        hist = pd.DataFrame(st.session_state.history).T
-        hist.columns = [f"R{r+1}" for r in range(rounds)]
-        hist.insert(0, "Player", players)
-        hist_df = hist.set_index("Player")
-        hist_df = hist_df.fillna(0)
-    else:
-        hist_df = pd.DataFrame({"Player": players}).set_index("Player")
-
-    # Add Total column
-    hist_df["Total"] = totals
-
-    # Add Left column (amount needed to reach 200)
-    hist_df["Left"] = [max(0, 200 - t) for t in totals]
-
-    # Order columns: Total, Left, then rounds
-    round_cols = [c for c in hist_df.columns if c.startswith("R")]
-    cols_order = ["Total", "Left"] + round_cols if round_cols else ["Total", "Left"]
-    hist_df = hist_df[cols_order]
-
-    # Styling: white -> dark green on Total
-    styled = hist_df.style.background_gradient(cmap="Greens", subset=["Total"]).format("{:.0f}")
-    st.write(styled)
-
+    # Rebuilt only when the history version changes
+    with perf.timed("render_table"):
+        styled = cache.get_history_table(st.session_state, totals)
+        st.write(styled)
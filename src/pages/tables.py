@@ -0,0 +1,104 @@
+# ---------------------
+# Imports
+# ---------------------
+import streamlit as st
+import src.core.scoring as scoring
+from src.core import cache
+from src.core.rules import DEFAULT_RULES
+
+# ---------------------
+# Callbacks
+# ---------------------
+def create_table():
+    name = st.session_state.new_table_name.strip()
+    players = [p.strip() for p in st.session_state.new_table_players.split(",") if p.strip()]
+    if not name or not players:
+        st.session_state.table_error = "A table needs a name and at least one player."
+        return
+    st.session_state.table_id = cache.get_table_registry().create(name, players)
+    st.session_state.new_table_name = ""
+    st.session_state.new_table_players = ""
+
+
+def commit_table_round(table_id, n_players, round_num):
+    keys = [f"table_input_{table_id}_{round_num}_{i}" for i in range(n_players)]
+    scores = [scoring.parse_score_input(st.session_state.get(key, "")) for key in keys]
+    committed = cache.get_table_registry().commit_round(table_id, scores, expected_round=round_num)
+    for key in keys:
+        st.session_state.pop(key, None)
+    if not committed:
+        st.session_state.table_error = f"Round {round_num} was already committed at this table; your scores weren't saved."
+
+
+def render_leaderboard(rows):
+    if not rows:
+        st.markdown("*No tables yet*")
+        return
+    text = "| # | Player | Table | Total | Round |\n|---|---|---|---|---|\n"
+    for rank, (total, player, table_name, round_num) in enumerate(rows, start=1):
+        text += f"| {rank} | {player} | {table_name} | {total:.0f} | {round_num} |\n"
+    st.markdown(text)
+
+
+# ---------------------
+# Page
+# ---------------------
+def show():
+    st.title("Tables")
+    st.caption("Every table at the event, shared by everyone on this server. Pick one to score it.")
+    registry = cache.get_table_registry()
+
+    with st.expander("New table"):
+        st.text_input("Table name", key="new_table_name", placeholder="e.g. Table 4")
+        st.text_input("Players (comma-separated)", key="new_table_players", placeholder="e.g. Chris, Bryan, AJ")
+        st.button("Create table", on_click=create_table)
+    if st.session_state.get("table_error"):
+        st.warning(st.session_state.pop("table_error"))
+
+    views = registry.tables()
+    if views:
+        labels = {view.table_id: f"{view.name} (round {view.round})" for view in views}
+        ids = list(labels)
+        current = st.session_state.get("table_id")
+        table_id = st.selectbox(
+            "Table",
+            ids,
+            index=ids.index(current) if current in labels else 0,
+            format_func=labels.get,
+        )
+        st.session_state.table_id = table_id
+        show_table(registry, registry.view(table_id))
+
+    st.markdown("---")
+    st.subheader("Leaderboard")
+    render_leaderboard(registry.leaderboard())
+
+
+def show_table(registry, view):
+    # Scores typed here stay in this session until committed to the shared table
+    for i, (player, total) in enumerate(zip(view.players, view.totals)):
+        row = st.columns([2, 2, 3])
+        row[0].markdown(f"**{player}**")
+        row[1].markdown(f"{total:.0f} ({max(0, DEFAULT_RULES.target_score - total):.0f})")
+        row[2].text_input(
+            label=f"table_score_{i}",
+            key=f"table_input_{view.table_id}_{view.round}_{i}",
+            label_visibility="collapsed",
+        )
+
+    commit_col, undo_col, redo_col = st.columns([2, 1, 1])
+    commit_col.button(
+        f"Commit Round {view.round}",
+        type="primary",
+        use_container_width=True,
+        on_click=commit_table_round,
+        args=(view.table_id, len(view.players), view.round),
+    )
+    undo_col.button("Undo ↩️", use_container_width=True, disabled=not view.can_undo,
+                    on_click=registry.undo, args=(view.table_id,))
+    redo_col.button("Redo ↪️", use_container_width=True, disabled=not view.can_redo,
+                    on_click=registry.redo, args=(view.table_id,))
+
+    # Cached per (table, history version), so viewers of an unchanged table share one frame
+    styled = registry.read(view.table_id, lambda state: cache.get_history_table(state, scoring.current_totals(state)))
+    st.write(styled)
@@ -0,0 +1,92 @@
+# ---------------------
+# Imports
+# ---------------------
+import random
+
+import numpy as np
+import pytest
+
+from src.core import advisor_logic
+
+
+# ---------------------
+# Helpers
+# ---------------------
+def _rest_of_deck(drawn, keep):
+    # Every master card not in `drawn` except the cards in `keep`, as a seen list
+    deck = advisor_logic.build_master_deck()
+    for card in list(drawn) + list(keep):
+        deck.remove(card)
+    return deck
+
+
+def _assert_parity(drawn_list, seen_list):
+    batch = advisor_logic.check_bust_batch(
+        advisor_logic.cards_to_counts(drawn_list), advisor_logic.cards_to_counts(seen_list)
+    )
+    for name in ("expected_value", "bust_chance", "event_chance"):
+        assert np.isfinite(batch[name]).all(), name
+    for i, (drawn, seen) in enumerate(zip(drawn_list, seen_list)):
+        deck = advisor_logic.pop_from_deck(seen, advisor_logic.pop_from_deck(drawn, advisor_logic.build_master_deck_state()))
+        advice = advisor_logic.check_bust(drawn, deck)
+        assert advice["current_score"] == batch["current_score"][i], drawn
+        assert advice["recommendation"] == batch["recommendation"][i], drawn
+        assert advice["expected_value"] == pytest.approx(batch["expected_value"][i], abs=1e-9), drawn
+        assert advice["bust_chance"] == pytest.approx(batch["bust_chance"][i], abs=1e-12), drawn
+        assert advice["event_chance"] == pytest.approx(batch["event_chance"][i], abs=1e-12), drawn
+
+
+# ---------------------
+# Tests
+# ---------------------
+EDGE_HANDS = [
+    [],
+    ["5", "8"],
+    ["5", "8", "x2", "+4"],
+    ["1", "2", "3", "4", "5", "6"],
+    ["1", "2", "3", "4", "5", "6", "7"],
+    ["5", "5"],  # busted
+    ["5", "5", "8", "x2", "+4"],  # busted
+    ["5", "sc"],  # holding Second Chance
+    ["5", "sc", "sc"],
+    ["5", "5", "sc"],  # Second Chance spent on the repeat
+    ["5", "5", "sc", "8", "8"],  # busted after spending it
+    ["5", "f3", "fr"],
+]
+
+
+@pytest.mark.parametrize("drawn", EDGE_HANDS, ids=lambda hand: ",".join(hand) or "empty")
+@pytest.mark.parametrize("keep", [[], ["12"], ["5"], ["sc"], ["12", "5"], ["f3", "x2"]], ids=str)
+def test_near_empty_decks(drawn, keep):
+    # Deck left holding exactly `keep` (nothing at all for [])
+    keep = [card for card in keep if card not in drawn or card in ("5", "12")]
+    _assert_parity([drawn], [_rest_of_deck(drawn, keep)])
+
+
+@pytest.mark.parametrize("drawn", EDGE_HANDS, ids=lambda hand: ",".join(hand) or "empty")
+def test_full_deck(drawn):
+    _assert_parity([drawn], [[]])
+
+
+def test_empty_deck_is_zero():
+    drawn = ["5", "8"]
+    batch = advisor_logic.check_bust_batch(
+        advisor_logic.cards_to_counts([drawn]), advisor_logic.cards_to_counts([_rest_of_deck(drawn, [])])
+    )
+    assert batch["expected_value"][0] == 0.0
+    assert batch["bust_chance"][0] == 0.0
+    assert batch["event_chance"][0] == 0.0
+    assert batch["recommendation"][0] == "STAY"
+
+
+def test_random_states():
+    rng = random.Random(0)
+    master = advisor_logic.build_master_deck()
+    drawn_list, seen_list = [], []
+    for _ in range(500):
+        deck = master.copy()
+        rng.shuffle(deck)
+        k = rng.randint(0, 8)
+        drawn_list.append(deck[:k])
+        seen_list.append(deck[k : k + rng.choice([0, 20, 60, len(deck)])])
+    _assert_parity(drawn_list, seen_list)
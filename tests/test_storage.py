@@ -0,0 +1,186 @@
+# ---------------------
+# Imports
+# ---------------------
+import json
+import os
+import threading
+
+from src.core import scoring, storage
+from src.core.storage import GameStore
+
+
+# ---------------------
+# Helpers
+# ---------------------
+def _game(store, writer=None, game_id=None, players=("A", "B", "C")):
+    ss = {"players": list(players)}
+    scoring.initialize_session_state(ss, store=store, game_id=game_id, writer=writer)
+    if not ss["game_started"]:
+        scoring.start_game(list(players), ss)
+    return ss
+
+
+def _state(ss):
+    players = list(ss["players"])
+    return {
+        "seq": ss["log_seq"],
+        "players": players,
+        "rows": scoring.get_history(ss).as_array(len(players)).tolist(),
+        "round": ss["round"],
+        "game_started": ss["game_started"],
+    }
+
+
+def _play(ss, rounds):
+    for i in range(rounds):
+        scoring.commit_round([float(i), 2.0 * i, 5.0], ss)
+        if i % 7 == 3:
+            scoring.edit_score(len(scoring.get_history(ss)) - 1, 2, 1.0, ss)
+        if i % 11 == 5:
+            scoring.undo(ss)
+
+
+def _load(tmp_path, game_id):
+    return GameStore(str(tmp_path)).load(game_id)
+
+
+# ---------------------
+# Replay
+# ---------------------
+def test_snapshot_plus_tail_replay(tmp_path):
+    store = GameStore(str(tmp_path))
+    ss = _game(store)
+    _play(ss, 2 * storage.SNAPSHOT_EVERY + 13)
+    store.flush()
+
+    log_path = tmp_path / f"{ss['game_id']}.jsonl"
+    with open(tmp_path / f"{ss['game_id']}.snapshot.json", encoding="utf-8") as f:
+        offset = json.load(f)["offset"]
+    assert 0 < offset < os.path.getsize(log_path)
+
+    # Everything before the snapshot's offset is never read again
+    data = log_path.read_bytes()
+    log_path.write_bytes(b"\n" * offset + data[offset:])
+    assert _load(tmp_path, ss["game_id"]) == _state(ss)
+
+
+def test_missing_snapshot_replays_whole_log(tmp_path):
+    store = GameStore(str(tmp_path))
+    ss = _game(store)
+    _play(ss, storage.SNAPSHOT_EVERY + 5)
+    store.flush()
+
+    os.remove(tmp_path / f"{ss['game_id']}.snapshot.json")
+    assert _load(tmp_path, ss["game_id"]) == _state(ss)
+
+
+def test_unknown_game(tmp_path):
+    store = GameStore(str(tmp_path))
+    assert store.load("0123abcd") is None
+    assert store.load("../etc/passwd") is None
+
+
+# ---------------------
+# Crash recovery
+# ---------------------
+def test_torn_last_line_is_skipped_and_closed(tmp_path):
+    store = GameStore(str(tmp_path))
+    ss = _game(store)
+    _play(ss, 4)
+    store.flush()
+    expected = _state(ss)
+
+    # A crash mid-write leaves half an event at the end of the log
+    log_path = tmp_path / f"{ss['game_id']}.jsonl"
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write('{"seq":99,"op":"rou')
+    assert _load(tmp_path, ss["game_id"]) == expected
+
+    # A restarted process resumes the game and keeps writing after the torn line
+    store = GameStore(str(tmp_path))
+    resumed = _game(store, game_id=ss["game_id"])
+    assert _state(resumed) == expected
+    scoring.commit_round([1.0, 2.0, 3.0], resumed)
+    store.flush()
+    assert resumed["log_seq"] == expected["seq"] + 1
+    assert _load(tmp_path, ss["game_id"]) == _state(resumed)
+
+
+def test_bad_snapshot_falls_back_to_log(tmp_path):
+    store = GameStore(str(tmp_path))
+    ss = _game(store)
+    _play(ss, storage.SNAPSHOT_EVERY + 2)
+    store.flush()
+
+    (tmp_path / f"{ss['game_id']}.snapshot.json").write_text('{"seq": 3, "play')
+    assert _load(tmp_path, ss["game_id"]) == _state(ss)
+
+
+# ---------------------
+# Seq numbers
+# ---------------------
+def test_concurrent_appends_get_unique_ordered_seqs(tmp_path):
+    store = GameStore(str(tmp_path))
+    per_thread = 200
+    seqs = []
+
+    def writer():
+        mine = [store.append("shared", {"op": "round", "scores": [1.0]}) for _ in range(per_thread)]
+        seqs.extend(mine)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.flush()
+
+    assert sorted(seqs) == list(range(1, 4 * per_thread + 1))
+    with open(tmp_path / "shared.jsonl", encoding="utf-8") as f:
+        logged = [json.loads(line)["seq"] for line in f]
+    assert logged == sorted(seqs)  # written in seq order
+
+
+# ---------------------
+# Writers
+# ---------------------
+def test_second_live_writer_gets_a_copy(tmp_path):
+    store = GameStore(str(tmp_path))
+    first = _game(store, writer="tab-1")
+    _play(first, 3)
+    game_id = first["game_id"]
+
+    second = _game(store, writer="tab-2", game_id=game_id)
+    assert second["forked_from"] == game_id
+    assert second["game_id"] != game_id
+    assert _state(second)["rows"] == _state(first)["rows"]
+
+    # Each tab keeps writing its own log
+    scoring.commit_round([10.0, 0.0, 0.0], first)
+    scoring.commit_round([0.0, 20.0, 0.0], second)
+    store.flush()
+    assert _load(tmp_path, game_id) == _state(first)
+    assert _load(tmp_path, second["game_id"]) == _state(second)
+
+
+def test_disconnected_writer_hands_over(tmp_path):
+    live = {"tab-1", "tab-2"}
+    store = GameStore(str(tmp_path), is_live=live.__contains__)
+    first = _game(store, writer="tab-1")
+    _play(first, 3)
+    game_id = first["game_id"]
+
+    # A refresh: the old session is gone, so the new one resumes the same game
+    live.discard("tab-1")
+    second = _game(store, writer="tab-2", game_id=game_id)
+    assert second["game_id"] == game_id
+    assert "forked_from" not in second
+
+    # The old session comes back and writes: it carries on as a copy instead
+    live.add("tab-1")
+    scoring.commit_round([1.0, 1.0, 1.0], second)
+    scoring.commit_round([9.0, 9.0, 9.0], first)
+    assert first["forked_from"] == game_id
+    store.flush()
+    assert _load(tmp_path, game_id) == _state(second)
+    assert _load(tmp_path, first["game_id"]) == _state(first)
@@ -0,0 +1,44 @@
+# ---------------------
+# Imports
+# ---------------------
+import pytest
+
+from src.core import targeting
+
+
+# ---------------------
+# Helpers
+# ---------------------
+def _rows(ranked, action):
+    return {row["name"]: row for row in ranked[action]}
+
+
+# ---------------------
+# Tests
+# ---------------------
+def test_swing_hand_checked():
+    # Deck 1, 2, 4: no draw busts either hand, and Flip 3 draws all of it.
+    #   one-step gain 7/3 each, so projected: You 50 + 3 + 7/3, A 60 + 10 + 7/3
+    #   base lead = 55.33 - 72.33 = -17
+    ranked = targeting.rank_targets(
+        {"You": ["3"], "A": ["10"]}, ["1", "2", "4"], {"You": 50, "A": 60}, "You"
+    )
+    freeze = _rows(ranked, "freeze")
+    flip_three = _rows(ranked, "flip_three")
+
+    # Freeze banks the current score: A ends on 70, You on 53
+    assert freeze["A"]["delta"] == pytest.approx(-7 / 3)
+    assert freeze["A"]["swing"] == pytest.approx(7 / 3)
+    assert freeze["You"]["swing"] == pytest.approx(-7 / 3)
+
+    # Flip 3 lands on exactly +7: A ends on 77, You on 60; the gain isn't counted twice
+    assert flip_three["A"]["delta"] == pytest.approx(7 - 7 / 3)
+    assert flip_three["A"]["swing"] == pytest.approx(-(7 - 7 / 3))
+    assert flip_three["You"]["swing"] == pytest.approx(7 - 7 / 3)
+
+    assert [row["name"] for row in ranked["flip_three"]] == ["You", "A"]
+    assert [row["name"] for row in ranked["freeze"]] == ["A", "You"]
+
+
+def test_no_hands():
+    assert targeting.rank_targets({}, ["1"]) == {"freeze": [], "flip_three": []}
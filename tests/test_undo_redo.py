@@ -0,0 +1,150 @@
+# ---------------------
+# Imports
+# ---------------------
+import pytest
+
+from src.core import scoring
+from src.core.storage import GameStore
+
+
+# ---------------------
+# Helpers
+# ---------------------
+def _game(players=("A", "B", "C"), store=None):
+    ss = {"players": list(players)}
+    scoring.initialize_session_state(ss, store=store)
+    scoring.start_game(list(players), ss)
+    return ss
+
+
+def _snapshot(ss):
+    # Everything a resumed game is rebuilt from (see storage.apply_event)
+    players = list(ss["players"])
+    return {
+        "players": players,
+        "rows": scoring.get_history(ss).as_array(len(players)).tolist(),
+        "round": ss["round"],
+        "game_started": ss["game_started"],
+    }
+
+
+# ---------------------
+# Tests
+# ---------------------
+def test_commit_undo_redo_round_trip():
+    ss = _game()
+    scoring.commit_round([10, 0, 25], ss)
+    scoring.commit_round([5, 12], ss)  # short rows are padded with zeros
+    before = (scoring.current_totals(ss), ss["round"])
+
+    assert scoring.undo(ss) == ("round", [5.0, 12.0, 0.0])
+    assert scoring.current_totals(ss) == [10.0, 0.0, 25.0]
+    assert ss["round"] == 2
+    assert scoring.can_redo(ss)
+
+    assert scoring.redo(ss) == ("round", [5.0, 12.0, 0.0])
+    assert (scoring.current_totals(ss), ss["round"]) == before
+    assert not scoring.can_redo(ss)
+
+
+def test_edit_and_add_player_undo():
+    ss = _game()
+    scoring.commit_round([10, 20, 30], ss)
+    scoring.edit_score(0, 1, 7, ss)
+    scoring.add_player("D", ss)
+    assert scoring.current_totals(ss) == [10.0, 7.0, 30.0, 0.0]
+
+    scoring.undo(ss)
+    assert ss["players"] == ["A", "B", "C"]
+    scoring.undo(ss)
+    assert scoring.current_totals(ss) == [10.0, 20.0, 30.0]
+
+    scoring.redo(ss)
+    scoring.redo(ss)
+    assert ss["players"] == ["A", "B", "C", "D"]
+    assert scoring.current_totals(ss) == [10.0, 7.0, 30.0, 0.0]
+
+
+def test_undo_restart_restores_old_history():
+    ss = _game()
+    scoring.commit_round([10, 20, 30], ss)
+    scoring.commit_round([1, 2, 3], ss)
+    history = scoring.get_history(ss)
+
+    scoring.restart_game(ss)
+    assert len(scoring.get_history(ss)) == 0
+    assert ss["round"] == 1
+    assert ss["game_started"] is False
+
+    scoring.undo(ss)
+    assert scoring.get_history(ss) is history
+    assert scoring.current_totals(ss) == [11.0, 22.0, 33.0]
+    assert ss["round"] == 3
+    assert ss["game_started"] is True
+
+
+def test_new_action_clears_redo():
+    ss = _game()
+    scoring.commit_round([1, 2, 3], ss)
+    scoring.undo(ss)
+    scoring.commit_round([4, 5, 6], ss)
+    assert not scoring.can_redo(ss)
+    assert scoring.redo(ss) is None
+
+
+def test_start_game_clears_both_stacks():
+    ss = _game()
+    scoring.commit_round([1, 2, 3], ss)
+    scoring.commit_round([4, 5, 6], ss)
+    scoring.undo(ss)
+    assert scoring.can_undo(ss) and scoring.can_redo(ss)
+
+    scoring.start_game(["X", "Y"], ss)
+    assert not scoring.can_undo(ss)
+    assert not scoring.can_redo(ss)
+    assert scoring.undo(ss) is None
+    assert scoring.current_totals(ss) == [0.0, 0.0]
+
+
+def test_undo_limit():
+    ss = _game()
+    for i in range(scoring.UNDO_LIMIT + 5):
+        scoring.commit_round([i, 0, 0], ss)
+    undone = 0
+    while scoring.undo(ss) is not None:
+        undone += 1
+    assert undone == scoring.UNDO_LIMIT
+    assert len(scoring.get_history(ss)) == 5
+
+
+@pytest.mark.parametrize("steps", [
+    # pop
+    ["round", "round", "undo"],
+    # restore, then replaying past it
+    ["round", "edit", "restart", "undo", "round"],
+    # remove_player, then a round with the shorter table
+    ["round", "add", "round", "undo", "undo", "round"],
+    # a redo of each kind
+    ["round", "add", "edit", "restart", "undo", "undo", "undo", "redo", "redo", "redo"],
+])
+def test_log_replay_matches_session(tmp_path, steps):
+    store = GameStore(str(tmp_path))
+    ss = _game(store=store)
+    for step in steps:
+        if step == "round":
+            scoring.commit_round([3.0 * len(ss["players"]), 7.0, 11.0], ss)
+        elif step == "edit":
+            scoring.edit_score(0, len(ss["players"]) - 1, 42.0, ss)
+        elif step == "add":
+            scoring.add_player(f"P{len(ss['players'])}", ss)
+        elif step == "restart":
+            scoring.restart_game(ss)
+        elif step == "undo":
+            assert scoring.undo(ss) is not None
+        else:
+            assert scoring.redo(ss) is not None
+
+    store.flush()
+    loaded = GameStore(str(tmp_path)).load(ss["game_id"])
+    assert loaded.pop("seq") == ss["log_seq"]
+    assert loaded == _snapshot(ss)